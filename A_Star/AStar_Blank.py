@@ -1,7 +1,11 @@
-import tkinter as tk
-from tkinter import messagebox
 import math
 
+from lazy_imports import lazy_import
+from raster import MapRenderer
+
+tk = lazy_import("tkinter")
+messagebox = lazy_import("tkinter.messagebox")
+
 class Cell:
     def __init__(self, x, y):
         self.x = x
@@ -121,6 +125,8 @@ class GUI:
         self.canvas.bind('<B1-Motion>', self.draw_obstacle)
         self.canvas.bind('<Button-1>', self.draw_obstacle)
         self.canvas.bind('<Button-3>', self.place_trash)
+        # Obstacles and trash are painted into one image (see raster.py)
+        self.renderer = MapRenderer(self.canvas, rows, cols, self.cell_size, trash_colour='red')
         self.highlight_goal()
 
         reset_button = tk.Button(root, text="Reset Board", command=self.reset_board)
@@ -141,18 +147,19 @@ class GUI:
         if not cell.is_obstacle and not cell.is_trash and cell != self.astar.start and cell != self.astar.end:
             cell.is_trash = True
             self.astar.trash_positions.append(cell)
-            self.canvas.create_oval(x * 20 + 5, y * 20 + 5, x * 20 + 15, y * 20 + 15, fill='red')
+            self.renderer.set_trash(y, x)
 
     def draw_obstacle(self, event):
         x, y = event.x // 20, event.y // 20
         if 0 <= x < self.cols and 0 <= y < self.rows:
             if not self.astar.grid[y][x].is_obstacle and not self.astar.grid[y][x].is_trash:
                 self.astar.set_obstacle(y, x)
-                self.canvas.create_rectangle(x * 20, y * 20, x * 20 + 20, y * 20 + 20, fill='black')
+                self.renderer.set_obstacle(y, x)
 
     def reset_board(self):
         self.astar = AStarPathfinding(self.rows, self.cols)
         self.canvas.delete("all")
+        self.renderer.reset()
         self.highlight_goal()
 
         self.distance_label.config(text="Total distance traveled: 0 meters")
@@ -162,16 +169,8 @@ class GUI:
         self.canvas.create_rectangle(y * 20 - 1, x * 20 - 1, y * 20 + 21, x * 20 + 21, outline='green', width=3)
 
     def draw_path(self, path):
-        for x, y in path:
-            # Calculate the center of the cell for placing the robot
-            center_x = y * self.cell_size + self.cell_size // 2
-            center_y = x * self.cell_size + self.cell_size // 2
-            # Calculate the coordinates for the robot
-            x1 = center_x - self.robot_size // 2
-            y1 = center_y - self.robot_size // 2
-            x2 = center_x + self.robot_size // 2
-            y2 = center_y + self.robot_size // 2
-            self.canvas.create_oval(x1, y1, x2, y2, fill='green')
+        # The whole route is one polyline, as wide as the robot
+        self.renderer.draw_path(path, 'green', width=self.robot_size)
 
         if path and not self.robot:  # Check if the robot ID exists
             self.robot = self.canvas.create_rectangle(path[0][1] * self.cell_size + self.cell_size // 2 - self.robot_size // 2,
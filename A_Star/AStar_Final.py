@@ -1,113 +1,34 @@
-import tkinter as tk
-import random
-from tkinter import messagebox
 import math
 
-class Cell:
-    def __init__(self, x, y):
-        self.x = x
-        self.y = y
-        self.is_obstacle = False
-        self.is_trash = False
-        self.g_cost = float("inf")
-        self.h_cost = 0
-        self.parent = None
+from lazy_imports import lazy_import
+from animator import RobotAnimator
+from any_angle import line_of_sight
+from brush import ObstacleBrush
+from cost_model import TERRAIN_COSTS
+from map_io import load_terrain_file
+from pathfinding import AStarPathfinding
+from raster import MapRenderer
+from search_stats import SearchStats
 
-    def __lt__(self, other):
-        return self.g_cost + self.h_cost < other.g_cost + other.h_cost
+tk = lazy_import("tkinter")
+messagebox = lazy_import("tkinter.messagebox")
+filedialog = lazy_import("tkinter.filedialog")
 
+# Animation speed multipliers offered in the GUI
+ANIMATION_SPEEDS = {"0.5x": 0.5, "1x": 1.0, "2x": 2.0, "4x": 4.0}
 
-class AStarPathfinding:
-    def __init__(self, rows, cols):
-        self.rows = rows
-        self.cols = cols
-        self.grid = [[Cell(x, y) for y in range(cols)] for x in range(rows)]
-        self.start = self.grid[0][0]
-        self.end = self.grid[rows - 1][cols - 1]
-        self.open_set = []
-        self.closed_set = []
-        self.trash_positions = []
-
-    def set_obstacle(self, x, y):
-        self.grid[x][y].is_obstacle = True
-
-    def calculate_h_cost(self, cell, target):
-        return abs(cell.x - target.x) + abs(cell.y - target.y)
-
-    def get_neighbors(self, cell):
-        neighbors = []
-        dx = [-1, 0, 1, 0, -1, -1, 1, 1]  # Movement in all eight directions
-        dy = [0, 1, 0, -1, -1, 1, 1, -1]
-
-        for i in range(8):  # Consider all EIGHT directions
-            nx, ny = cell.x + dx[i], cell.y + dy[i]
-
-            if 0 <= nx < self.rows and 0 <= ny < self.cols and not self.grid[nx][ny].is_obstacle:
-                neighbors.append(self.grid[nx][ny])
-
-        return neighbors
-
-
-    def reconstruct_path(self, current):
-        path = []
-
-        while current is not None:
-            path.append((current.x, current.y))
-            current = current.parent
-        return path[::-1]
-
-    def run_algorithm(self):
-        # Combine trash positions with end cell as the last destination
-        destinations = [self.start] + self.trash_positions + [self.end]
-
-        path = []
-        for i in range(len(destinations) - 1):
-            start = destinations[i]
-            end = destinations[i + 1]
-
-            current_path = self.run_path(start, end)
-            if not current_path:
-                return None
-
-            path.extend(current_path[:-1])  # Exclude the last cell (end position) from the current path
-
-        return path
-
-    def run_path(self, start, end):
-        self.open_set = []
-        self.closed_set = []
-        for row in self.grid:
-            for cell in row:
-                cell.g_cost = float("inf")
-                cell.parent = None
-
-        self.open_set.append(start)
-
-        while self.open_set:
-            current = min(self.open_set, key=lambda cell: cell.g_cost + cell.h_cost)
-
-            if current == end:
-                return self.reconstruct_path(current)
-
-            self.open_set.remove(current)
-            self.closed_set.append(current)
-
-            for neighbor in self.get_neighbors(current):
-                if neighbor in self.closed_set:
-                    continue
+# Path colour of each robot in a fleet
+ROBOT_COLOURS = ('green', 'blue', 'purple', 'red', 'cyan', 'magenta', 'yellow', 'brown')
 
-                tentative_g_cost = current.g_cost + self.calculate_h_cost(neighbor, end)
+# What the brush paints, and the colour each slower kind of sand is shown in
+PAINT_MODES = ("Obstacle", "Wet sand", "Soft sand")
+TERRAIN_COLOURS = {"wet sand": '#a08560', "soft sand": '#f5e6b8'}
 
-                if neighbor not in self.open_set:
-                    self.open_set.append(neighbor)
-                elif tentative_g_cost >= neighbor.g_cost:
-                    continue
 
-                neighbor.parent = current
-                neighbor.g_cost = tentative_g_cost
-                neighbor.h_cost = self.calculate_h_cost(neighbor, end)
-
-        return None
+def terrain_colour(cost):
+    # Colour of the dearest kind of sand that costs no more than cost, None for dry sand
+    kinds = [kind for kind in TERRAIN_COLOURS if TERRAIN_COSTS[kind] <= cost]
+    return TERRAIN_COLOURS[max(kinds, key=TERRAIN_COSTS.get)] if kinds else None
 
 
 class GUI:
@@ -125,10 +46,14 @@ class GUI:
         self.canvas = tk.Canvas(root, width=canvas_width, height=canvas_height, bg='white')
         self.canvas.pack()
         self.sand_image = tk.PhotoImage(file=r"A_Star\sandSandSand.png")
-        self.draw_sand_background()
+        # The sand, obstacles and trash are all painted into one image (see raster.py)
+        self.renderer = MapRenderer(self.canvas, rows, cols, self.cell_size, texture=self.sand_image)
         self.trash_image = tk.PhotoImage(file=r"A_Star\trash.png")
+        # Obstacles and slow sand are painted in strokes: press, drag, release
+        self.brush = ObstacleBrush(self.canvas, rows, cols, self.paint, preview=self.preview_paint)
+        self.canvas.bind('<Button-1>', self.start_stroke)
         self.canvas.bind('<B1-Motion>', self.draw_obstacle)
-        self.canvas.bind('<Button-1>', self.draw_obstacle)
+        self.canvas.bind('<ButtonRelease-1>', self.end_stroke)
         self.canvas.bind('<Button-3>', self.place_trash)
         self.highlight_goal()
 
@@ -138,15 +63,63 @@ class GUI:
         self.distance_label = tk.Label(root, text="Total distance traveled: 0 meters")
         self.distance_label.pack()
 
-        self.robot_size = 10  # Robot size = 10x10 pixels
-        self.robot_speed = 3  # Robot speed = 3 pixels per step
-
-        self.robot = None
+        # What strokes paint, the brush size in cells, and whether strokes erase instead
+        # (erasing sand turns it back into dry sand)
+        brush_row = tk.Frame(root)
+        brush_row.pack()
+        self.paint_mode = tk.StringVar(value=PAINT_MODES[0])
+        tk.OptionMenu(brush_row, self.paint_mode, *PAINT_MODES).pack(side="left")
+        tk.Label(brush_row, text="Brush:").pack(side="left")
+        self.brush_size = tk.IntVar(value=1)
+        tk.Spinbox(brush_row, from_=1, to=5, width=3, textvariable=self.brush_size,
+                   state="readonly").pack(side="left")
+        self.erase_mode = tk.BooleanVar(value=False)
+        tk.Checkbutton(brush_row, text="Erase", variable=self.erase_mode).pack(side="left")
+        tk.Button(brush_row, text="Load terrain...", command=self.load_terrain).pack(side="left")
+
+        # Search statistics are only collected while the box is ticked
+        self.search_stats = SearchStats()
+        self.show_stats = tk.BooleanVar(value=False)
+        stats_toggle = tk.Checkbutton(root, text="Show search statistics", variable=self.show_stats,
+                                      command=self.toggle_stats)
+        stats_toggle.pack()
+        self.stats_label = tk.Label(root, text="", font=("Arial", 8))
+        self.stats_label.pack()
+
+        # Robots sharing the trash; all of them start from the top-left corner
+        robot_row = tk.Frame(root)
+        robot_row.pack()
+        tk.Label(robot_row, text="Robots:").pack(side="left")
+        self.robot_count = tk.IntVar(value=1)
+        tk.Spinbox(robot_row, from_=1, to=len(ROBOT_COLOURS), width=3, textvariable=self.robot_count,
+                   state="readonly").pack(side="left")
+        # Straight runs between turns instead of cell-by-cell zigzags
+        self.any_angle = tk.BooleanVar(value=False)
+        tk.Checkbutton(robot_row, text="Any-angle paths", variable=self.any_angle).pack(side="left")
 
-    def draw_sand_background(self):
-        for x in range(0, self.cols * self.cell_size, self.sand_image.width()):
-            for y in range(0, self.rows * self.cell_size, self.sand_image.height()):
-                self.canvas.create_image(x, y, anchor="nw", image=self.sand_image)
+        self.robot_size = 10  # Robot size = 10x10 pixels
+        self.robot_speed = 100  # Robot speed = 100 pixels per second at 1x
+
+        self.robots = []
+        self.animator = RobotAnimator(self.canvas, self.cell_size, self.robot_size, self.robot_speed)
+        self.animator.route_check = self.check_route
+
+        # A single robot's route streams in a leg at a time (astar.iter_legs): the robot sets
+        # off on the first leg while an idle callback plans each next one
+        self.legs = None
+        self.leg_job = None
+        self.route = []
+        self.route_legs = 0
+        self.route_robot = None
+
+        # Animation controls; the Tk event loop keeps running while robots move
+        animation_row = tk.Frame(root)
+        animation_row.pack()
+        self.pause_button = tk.Button(animation_row, text="Pause", width=7, command=self.toggle_pause)
+        self.pause_button.pack(side="left")
+        tk.Label(animation_row, text="Speed:").pack(side="left")
+        self.speed_choice = tk.StringVar(value="1x")
+        tk.OptionMenu(animation_row, self.speed_choice, *ANIMATION_SPEEDS, command=self.set_speed).pack(side="left")
 
     def place_trash(self, event):
         x, y = event.x // 20, event.y // 20
@@ -155,7 +128,7 @@ class GUI:
         if not cell.is_obstacle and not cell.is_trash and cell != self.astar.start and cell != self.astar.end:
             cell.is_trash = True
             self.astar.trash_positions.append(cell)
-            self.canvas.create_oval(x * 20 + 5, y * 20 + 5, x * 20 + 15, y * 20 + 15, fill='grey')
+            self.renderer.set_trash(y, x)
 
             # Get the count of trash positions and display it on the circle
             trash_count = len(self.astar.trash_positions)
@@ -163,106 +136,221 @@ class GUI:
             center_y = y * 20 + 10  # Middle y-coordinate of the circle
             self.canvas.create_text(center_x, center_y, text=str(trash_count), fill="white", font=("Arial", 9, "bold"))
 
+    def start_stroke(self, event):
+        self.brush.size = self.brush_size.get()
+        self.brush.erase = self.erase_mode.get()
+        self.brush.press(event.y // self.cell_size, event.x // self.cell_size)
+
     def draw_obstacle(self, event):
-        x, y = event.x // 20, event.y // 20
-        if 0 <= x < self.cols and 0 <= y < self.rows:
-            if not self.astar.grid[y][x].is_obstacle and not self.astar.grid[y][x].is_trash:
-                self.astar.set_obstacle(y, x)
-                self.canvas.create_rectangle(x * 20, y * 20, x * 20 + 20, y * 20 + 20, fill='black')
+        self.brush.drag(event.y // self.cell_size, event.x // self.cell_size)
+
+    def end_stroke(self, event):
+        self.brush.release()
+
+    def preview_paint(self, cells, erase):
+        # Show a stroke while it is drawn; the map itself only changes when it ends
+        mode = self.paint_mode.get()
+        if mode == "Obstacle":
+            grid = self.astar.grid
+            self.renderer.set_obstacles([(x, y) for x, y in cells if not grid[x][y].is_trash], blocked=not erase)
+        else:
+            self.renderer.set_terrain(cells, TERRAIN_COLOURS.get("dry sand" if erase else mode.lower()))
+
+    def paint(self, cells, erase):
+        mode = self.paint_mode.get()
+        if mode == "Obstacle":
+            self.paint_obstacles(cells, erase)
+        else:
+            self.paint_terrain(cells, "dry sand" if erase else mode.lower())
+
+    def paint_obstacles(self, cells, erase):
+        # One bulk update per finished stroke; trash cells are never painted over
+        grid = self.astar.grid
+        cells = [(x, y) for x, y in cells if not grid[x][y].is_trash]
+        changed = self.astar.set_obstacles(cells, blocked=not erase)
+        self.renderer.set_obstacles(changed, blocked=not erase)
+
+    def paint_terrain(self, cells, kind):
+        changed = self.astar.set_terrain(cells, TERRAIN_COSTS[kind])
+        self.renderer.set_terrain(changed, TERRAIN_COLOURS.get(kind))
+
+    def load_terrain(self):
+        path = filedialog.askopenfilename(title="Load terrain costs",
+                                          filetypes=[("Terrain files", "*.txt *.csv *.json"), ("All files", "*")])
+        if not path:
+            return
+        try:
+            terrain = load_terrain_file(path, self.rows, self.cols)
+        except (OSError, ValueError) as error:
+            messagebox.showerror("Terrain not loaded", str(error))
+            return
+        self.astar.load_terrain([cost for row in terrain for cost in row])
+        cells_by_colour = {}
+        for x, row in enumerate(terrain):
+            for y, cost in enumerate(row):
+                cells_by_colour.setdefault(terrain_colour(cost), []).append((x, y))
+        for colour, cells in cells_by_colour.items():
+            self.renderer.set_terrain(cells, colour)
 
     def reset_board(self):
+        self.stop_route()
         self.astar = AStarPathfinding(self.rows, self.cols)
         self.canvas.delete("all")
-        self.draw_sand_background()
+        self.renderer.reset()
         self.highlight_goal()
 
-        # Deleting the robot and resetting its ID
-        if self.robot:
-            self.canvas.delete(self.robot)
-            self.robot = None
+        # Stopping and deleting the robots and resetting their IDs
+        self.animator.stop()
+        self.pause_button.config(text="Pause")
+        for robot in self.robots:
+            self.canvas.delete(robot)
+        self.robots = []
 
         self.distance_label.config(text="Total distance traveled: 0 meters")
+        self.toggle_stats()
+
+    def toggle_pause(self):
+        if self.animator.paused:
+            self.animator.resume()
+            self.pause_button.config(text="Pause")
+        else:
+            self.animator.pause()
+            self.pause_button.config(text="Resume")
+
+    def set_speed(self, choice):
+        self.animator.set_speed(ANIMATION_SPEEDS[choice])
+
+    def toggle_stats(self):
+        observers = self.astar.search_observers
+        if self.show_stats.get():
+            if self.search_stats not in observers:
+                observers.append(self.search_stats)
+        elif self.search_stats in observers:
+            observers.remove(self.search_stats)
+        self.search_stats.run_started(self.astar)
+        self.stats_label.config(text="")
 
     def highlight_goal(self):
         x, y = self.astar.end.x, self.astar.end.y
         self.canvas.create_rectangle(y * 20 - 1, x * 20 - 1, y * 20 + 21, x * 20 + 21, outline='green', width=3)
 
-    def draw_path(self, path):
-        for x, y in path:
-            # Calculate the CENTER of the cell for placing the robot
-            center_x = y * self.cell_size + self.cell_size // 2
-            center_y = x * self.cell_size + self.cell_size // 2
-            # Calculate the COORDS for the robot
-            x1 = center_x - self.robot_size // 2
-            y1 = center_y - self.robot_size // 2
-            x2 = center_x + self.robot_size // 2
-            y2 = center_y + self.robot_size // 2
-            self.canvas.create_oval(x1, y1, x2, y2, fill='green')
-
-        if path and not self.robot:  # Check if the robot ID exists
-            self.robot = self.canvas.create_rectangle(path[0][1] * self.cell_size + self.cell_size // 2 - self.robot_size // 2,
-                                                      path[0][0] * self.cell_size + self.cell_size // 2 - self.robot_size // 2,
-                                                      path[0][1] * self.cell_size + self.cell_size // 2 + self.robot_size // 2,
-                                                      path[0][0] * self.cell_size + self.cell_size // 2 + self.robot_size // 2,
-                                                      fill='grey')
-            self.move_robot(path)
-
-    def move_robot(self, path):
-        if not path:
+    def draw_path(self, path, colour='green'):
+        # The whole route is one polyline, as wide as the robot
+        self.renderer.draw_path(path, colour, width=self.robot_size)
+
+    def draw_paths(self, paths, complete=True):
+        # complete=False when more legs will be appended to the robots' paths later
+        for i, path in enumerate(paths):
+            self.draw_path(path, ROBOT_COLOURS[i % len(ROBOT_COLOURS)])
+
+        if paths and not self.robots:  # Check if the robots exist
+            for path in paths:
+                center_x = path[0][1] * self.cell_size + self.cell_size // 2
+                center_y = path[0][0] * self.cell_size + self.cell_size // 2
+                self.robots.append(self.canvas.create_rectangle(center_x - self.robot_size // 2,
+                                                                center_y - self.robot_size // 2,
+                                                                center_x + self.robot_size // 2,
+                                                                center_y + self.robot_size // 2,
+                                                                fill='grey'))
+            for robot, path in zip(self.robots, paths):
+                self.animator.add(robot, path, complete)
+            self.animator.start()
+
+    def check_route(self, path, i):
+        # An obstacle was drawn on the route while the robot was moving, so repair the
+        # rest of the route from the cell the robot is standing on and keep going
+        if line_of_sight(self.astar, path[i - 1], path[i]):
+            return path
+        repaired = self.astar.repair_route(path[i - 1], path[i:])
+        if repaired is None:
+            self.stop_route()
+            messagebox.showinfo("No Path Found", "An obstacle cut the robot off from the rest of its route.")
+            return None
+        self.draw_detour(repaired)
+        return path[:i - 1] + repaired
+
+    def draw_detour(self, path):
+        self.renderer.draw_path(path, 'orange', width=self.robot_size // 2)
+        for robot in self.robots:
+            self.canvas.tag_raise(robot)
+
+    def run_algorithm(self):
+        self.astar.robot_count = self.robot_count.get()
+        self.astar.any_angle = self.any_angle.get()
+        self.stop_route()
+        if self.astar.robot_count > 1:
+            self.run_fleet()
             return
 
-        # Calculate the intermediate points for SMOOTHER MOVEMENT
-        x_points, y_points = [], []
-        for x, y in path:
-            x_points.append(y * self.cell_size + self.cell_size // 2)
-            y_points.append(x * self.cell_size + self.cell_size // 2)
-
-        for i in range(1, len(x_points)):
-            x1, y1 = x_points[i - 1], y_points[i - 1]
-            x2, y2 = x_points[i], y_points[i]
-
-            # Calculate the total distance and number of steps needed for interpolation
-            distance = math.sqrt((x2 - x1) ** 2 + (y2 - y1) ** 2)
-            num_steps = max(int(distance / self.robot_speed), 1)
-
-            # Calculate the step size for interpolation
-            step_x = (x2 - x1) / num_steps
-            step_y = (y2 - y1) / num_steps
-
-            for _ in range(num_steps):
-                # Move the robot to the next intermediate point
-                self.canvas.coords(self.robot,
-                                x1 + _ * step_x - self.robot_size // 2,
-                                y1 + _ * step_y - self.robot_size // 2,
-                                x1 + _ * step_x + self.robot_size // 2,
-                                y1 + _ * step_y + self.robot_size // 2)
-                self.canvas.update()
-                self.canvas.after(30)
-
-        x, y = path[-1]
-        center_x = y * self.cell_size + self.cell_size // 2
-        center_y = x * self.cell_size + self.cell_size // 2
-        self.canvas.coords(self.robot,
-                        center_x - self.robot_size // 2,
-                        center_y - self.robot_size // 2,
-                        center_x + self.robot_size // 2,
-                        center_y + self.robot_size // 2)
-
-        self.canvas.after(500, lambda: self.move_robot(path[1:]))
+        self.legs = self.astar.iter_legs()
+        self.route = []
+        self.route_legs = 0
+        self.next_leg()
+
+    def stop_route(self):
+        if self.leg_job is not None:
+            self.canvas.after_cancel(self.leg_job)
+            self.leg_job = None
+        self.legs = None
+        if self.route_robot is not None:
+            self.animator.finish(self.route_robot)
+            self.route_robot = None
+
+    def next_leg(self):
+        # Plans one more leg of the streaming route, draws it and hands it to the robot
+        self.leg_job = None
+        leg = next(self.legs, False)
+        if not leg:
+            self.stop_route()
+            if self.show_stats.get():
+                self.stats_label.config(text=self.search_stats.summary())
+            if leg is None:
+                messagebox.showinfo("No Path Found", "A* algorithm could not find a path to the destination.")
+            elif self.route:
+                self.show_distance(self.route)
+            return
 
-    def run_algorithm(self):
-        path = self.astar.run_algorithm()
-
-        if path:
-            total_distance = 0
-            for i in range(1, len(path)):
-                x1, y1 = path[i - 1]
-                x2, y2 = path[i]
-                total_distance += math.sqrt((x2 - x1) ** 2 + (y2 - y1) ** 2)
-            
-            self.distance_label.config(text=f"Total distance traveled: {total_distance:.2f} meters")
-
-            self.draw_path(path)
+        if self.route:
+            self.route.extend(leg[1:])
+            self.draw_path(leg)
+            if self.route_robot is not None:
+                self.animator.extend(self.route_robot, leg[1:])
+        else:
+            self.route = list(leg)
+            had_robots = bool(self.robots)
+            self.draw_paths([leg], complete=False)
+            self.route_robot = None if had_robots else self.robots[0]
+        self.route_legs += 1
+        self.distance_label.config(text=f"Planning route: {self.route_legs} of {len(self.astar.route_stops)} legs")
+        self.leg_job = self.canvas.after_idle(self.next_leg)
+
+    def show_distance(self, path):
+        total_distance = 0
+        for i in range(1, len(path)):
+            x1, y1 = path[i - 1]
+            x2, y2 = path[i]
+            total_distance += math.sqrt((x2 - x1) ** 2 + (y2 - y1) ** 2)
+
+        distance_text = f"Total distance traveled: {total_distance:.2f} meters"
+        saved = self.astar.click_order_distance - self.astar.optimized_distance
+        if self.astar.weighted:
+            # Routes minimise travel cost over the terrain rather than distance
+            distance_text += f", travel cost {self.astar.path_cost(path):.2f}"
+            if saved > 0:
+                distance_text += f" ({saved:.2f} less than placement order)"
+        elif saved > 0:
+            distance_text += f" ({saved:.2f} meters shorter than placement order)"
+        self.distance_label.config(text=distance_text)
+
+    def run_fleet(self):
+        paths = self.astar.run_fleet()
+        if self.show_stats.get():
+            self.stats_label.config(text=self.search_stats.summary())
+
+        if paths:
+            self.distance_label.config(text=f"{len(paths)} robots: longest route {self.astar.makespan:.2f} meters, "
+                                            f"{self.astar.fleet_distance:.2f} meters in total")
+            self.draw_paths(paths)
         else:
             messagebox.showinfo("No Path Found", "A* algorithm could not find a path to the destination.")
 
@@ -1,9 +1,10 @@
-import tkinter as tk
-from tkinter import messagebox
 import math
-import matplotlib.pyplot as plt
-from matplotlib.animation import FuncAnimation
-import numpy as np
+
+from lazy_imports import lazy_import
+from raster import MapRenderer
+
+tk = lazy_import("tkinter")
+messagebox = lazy_import("tkinter.messagebox")
 
 class Cell:
     def __init__(self, x, y):
@@ -133,44 +134,28 @@ class GUI:
 
         self.robot_size = 5
         self.robot_speed = 3
-        self.prev_x = self.prev_y = 0  # Initialize prev_x and prev_y for draw_path_animation
 
         self.sand_image = tk.PhotoImage(file=r"A_Star\sandSandSand.png")
         self.trash_image = tk.PhotoImage(file=r"A_Star\trash.png")
         self.obstacle_image = tk.PhotoImage(file=r"A_Star\obstacle.png")
 
-        self.draw_sand_background()  # Draw sand background immediately
-        
         self.trash_image = self.trash_image.subsample(self.trash_image.width() // self.cell_size,
                                                       self.trash_image.height() // self.cell_size)
         self.obstacle_image = self.obstacle_image.subsample(self.obstacle_image.width() // self.cell_size,
                                                             self.obstacle_image.height() // self.cell_size)
 
-        self.robot = None
-
-    def draw_sand_background(self):
-        canvas_width = self.cols * self.cell_size
-        canvas_height = self.rows * self.cell_size
-
-        # Create a background rectangle with the sand image
-        bg_rect = self.canvas.create_rectangle(0, 0, canvas_width, canvas_height, fill="", outline="")
-        self.canvas.itemconfig(bg_rect, fill="", outline="")
-        self.canvas.tag_lower(bg_rect)
+        # Sand, obstacles and trash are all painted into one image (see raster.py)
+        self.renderer = MapRenderer(self.canvas, rows, cols, self.cell_size, texture=self.sand_image,
+                                    obstacle_sprite=self.obstacle_image, trash_sprite=self.trash_image)
 
-        # Overlay the sand texture on the background
-        for x in range(0, canvas_width, self.sand_image.width()):
-            for y in range(0, canvas_height, self.sand_image.height()):
-                self.canvas.create_image(x, y, anchor="nw", image=self.sand_image)
+        self.robot = None
 
-        # Update the canvas to display the changes
-        self.canvas.update()
-    
     def draw_obstacle(self, event):
         x, y = event.x // self.cell_size, event.y // self.cell_size
         if 0 <= x < self.cols and 0 <= y < self.rows:
             if not self.astar.grid[y][x].is_obstacle and not self.astar.grid[y][x].is_trash:
                 self.astar.set_obstacle(y, x)
-                self.canvas.create_image(x * self.cell_size, y * self.cell_size, anchor="nw", image=self.obstacle_image)
+                self.renderer.set_obstacle(y, x)
 
     def place_trash(self, event):
         x, y = event.x // self.cell_size, event.y // self.cell_size
@@ -179,12 +164,12 @@ class GUI:
         if not cell.is_obstacle and not cell.is_trash and cell != self.astar.start and cell != self.astar.end:
             cell.is_trash = True
             self.astar.trash_positions.append(cell)
-            self.canvas.create_image(x * self.cell_size, y * self.cell_size, anchor="nw", image=self.trash_image)
+            self.renderer.set_trash(y, x)
 
     def reset_board(self):
         self.astar = AStarPathfinding(self.rows, self.cols)
         self.canvas.delete("all")
-        self.draw_sand_background()
+        self.renderer.reset()
         self.highlight_goal()
 
         self.distance_label.config(text="Total distance traveled: 0 meters")
@@ -199,17 +184,8 @@ class GUI:
         if not path:
             return
 
-        for i in range(1, len(path)):
-            x, y = path[i]
-            x_center = y * self.cell_size + self.cell_size // 2
-            y_center = x * self.cell_size + self.cell_size // 2
-
-            self.canvas.create_line(
-                self.prev_x, self.prev_y, x_center, y_center,
-                fill="blue", dash=(4, 4)
-            )
-
-            self.prev_x, self.prev_y = x_center, y_center
+        # The whole route is one dashed polyline
+        self.renderer.draw_path(path, "blue", width=1, dash=(4, 4))
 
         self.animate_robot_on_path(path)
 
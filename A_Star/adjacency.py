@@ -0,0 +1,111 @@
+# Neighbor graph: the legal moves out of each cell, worked out the first time a search
+# expands the cell and kept until an edit nearby.
+#
+# Building the moves on every expansion (bounds checks, obstacle checks, corner rule and a
+# fresh list) is most of what a plain A* spends per cell. Here the legal moves of a cell are
+# one 8-bit mask, bit k for DIRECTIONS[k], in masks (two bytes per cell), and moves[mask] is
+# the tuple of (index offset, half move length) pairs for that mask, shared by every cell.
+# Searches read masks[index] directly and call fill(index) only for a cell that is still
+# UNBUILT. Nothing is built before the first query and a query only pays for the cells it
+# expands, so set-up time and memory stay flat on big maps.
+#
+# A move from a to b costs its half length times terrain[a] + terrain[b], read from the
+# terrain as the search goes: exactly 1 or sqrt(2) on dry sand, and terrain edits never touch
+# the masks. A map listener marks every edited cell and its eight neighbors UNBUILT again,
+# since an obstacle edit only changes the moves into and out of those cells (including the
+# diagonals a blocked cell squeezes past). Big edits and switching the corner rule reset
+# every mask. Like the searches always have, a blocked cell keeps its moves out and only
+# loses the moves into it, so a robot standing on a cell that was painted over can still leave.
+#
+# export() packs the whole graph into plain CSR (row offsets, targets, costs) for tools
+# outside the planner.
+
+from array import array
+
+from cost_model import DIRECTIONS, HALF_DIAGONAL_COST, HALF_STRAIGHT_COST
+
+# Mask of a cell whose moves haven't been worked out since the last edit around it; above
+# every real 8-bit mask
+UNBUILT = 0x100
+
+
+class Adjacency:
+    def __init__(self, astar):
+        self.astar = astar
+        cols = astar.cols
+        self.masks = array("H", [UNBUILT]) * (astar.rows * cols)
+        self.built_for = astar.allow_corner_cutting
+        # (dx, dy, index offset, half length) of each move, in DIRECTIONS order
+        self.directions = [(dx, dy, dx * cols + dy, HALF_DIAGONAL_COST if dx and dy else HALF_STRAIGHT_COST)
+                           for dx, dy in DIRECTIONS]
+        self.moves = tuple(tuple((offset, half_length)
+                                 for bit, (_, _, offset, half_length) in enumerate(self.directions)
+                                 if mask >> bit & 1)
+                           for mask in range(256))
+        astar.map_listeners.append(self.cells_changed)
+
+    def close(self):
+        if self.cells_changed in self.astar.map_listeners:
+            self.astar.map_listeners.remove(self.cells_changed)
+
+    def ensure_built(self):
+        # The masks hold for one corner rule; switching it starts over
+        if self.built_for != self.astar.allow_corner_cutting:
+            self.built_for = self.astar.allow_corner_cutting
+            self.reset()
+
+    def reset(self):
+        self.masks = array("H", [UNBUILT]) * len(self.masks)
+
+    def cells_changed(self, cells):
+        astar = self.astar
+        rows, cols, masks = astar.rows, astar.cols, self.masks
+        if len(cells) * 9 > len(masks):
+            self.reset()  # Cheaper than marking most of the map cell by cell
+            return
+        for x, y in cells:
+            for nx in range(max(x - 1, 0), min(x + 2, rows)):
+                for ny in range(max(y - 1, 0), min(y + 2, cols)):
+                    masks[nx * cols + ny] = UNBUILT
+
+    def fill(self, index):
+        # Work out, store and return the mask of legal moves out of one cell
+        astar = self.astar
+        rows, cols, obstacles = astar.rows, astar.cols, astar.obstacles
+        corner_cutting = self.built_for
+        x, y = divmod(index, cols)
+        mask, bit = 0, 1
+        for dx, dy, offset, _ in self.directions:
+            nx, ny = x + dx, y + dy
+            # Without corner cutting a diagonal needs both cells it squeezes past to be free
+            if (0 <= nx < rows and 0 <= ny < cols and not obstacles[index + offset] and
+                    (corner_cutting or not (dx and dy) or
+                     not (obstacles[index + dx * cols] or obstacles[index + dy]))):
+                mask |= bit
+            bit <<= 1
+        self.masks[index] = mask
+        return mask
+
+    def steps(self, index):
+        # (neighbor index, step cost) pairs out of one cell
+        mask = self.masks[index]
+        if mask == UNBUILT:
+            mask = self.fill(index)
+        terrain = self.astar.terrain
+        here = terrain[index]
+        return [(index + offset, half_length * (here + terrain[index + offset]))
+                for offset, half_length in self.moves[mask]]
+
+    def export(self):
+        # Plain CSR arrays (offsets, targets, costs): the moves out of cell i are
+        # targets[offsets[i]:offsets[i + 1]], with matching step costs
+        self.ensure_built()
+        size = len(self.masks)
+        offsets = array("i", [0]) * (size + 1)
+        targets, costs = array("i"), array("d")
+        for index in range(size):
+            for neighbor, cost in self.steps(index):
+                targets.append(neighbor)
+                costs.append(cost)
+            offsets[index + 1] = len(targets)
+        return offsets, targets, costs
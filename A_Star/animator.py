@@ -0,0 +1,172 @@
+# Non-blocking robot animation for the tkinter GUI.
+#
+# Each route is turned once into a Trajectory: the pixel centre of every cell and the
+# distance travelled when the robot reaches it, as flat arrays. The animator then runs off
+# after() callbacks: every tick it advances each robot by elapsed time x speed, moves a
+# cursor forward over the cells it passed and interpolates within the current segment. The
+# Tk event loop stays free between ticks, robot speed doesn't depend on how long a frame
+# takes, and a tick costs the same however long the route is. The next tick is scheduled
+# for what is left of the frame budget after this one's work.
+#
+# A route can also arrive a leg at a time: a robot added with complete=False sets off on the
+# legs it has, extend() appends the next ones, and if it catches up with the planner it waits
+# at the end of the last leg until more arrive or finish() says there are none.
+
+import math
+import time
+from array import array
+
+
+class Trajectory:
+    __slots__ = ("path", "xs", "ys", "distances", "segment", "checked", "travelled", "complete", "cell_size")
+
+    def __init__(self, path, cell_size, complete=True):
+        self.path = []
+        self.cell_size = cell_size
+        self.xs, self.ys, self.distances = array("d"), array("d"), array("d")
+        self.extend(path)
+        # The robot is on its way from path[segment - 1] to path[segment]
+        self.segment = 1
+        self.checked = False
+        self.travelled = 0.0
+        # False while more legs of the route may still be appended
+        self.complete = complete
+
+    def extend(self, cells):
+        half = self.cell_size / 2
+        xs, ys, distances = self.xs, self.ys, self.distances
+        for x, y in cells:
+            xs.append(y * self.cell_size + half)
+            ys.append(x * self.cell_size + half)
+            distances.append(distances[-1] + math.hypot(xs[-1] - xs[-2], ys[-1] - ys[-2]) if distances else 0.0)
+        self.path.extend(cells)
+
+
+class RobotAnimator:
+    def __init__(self, canvas, cell_size, robot_size, speed, frame_ms=16):
+        self.canvas = canvas
+        self.cell_size = cell_size
+        self.robot_size = robot_size
+        self.speed = speed  # Pixels per second at 1x
+        self.speed_factor = 1.0
+        self.frame_ms = frame_ms
+        self.paused = False
+        self.robots = []  # [canvas item, Trajectory] pairs still moving
+        self.job = None
+        self.last_tick = 0.0
+
+        # Called as route_check(path, i) before a robot sets off towards path[i]. Returns the
+        # path to follow (path itself if nothing changed, or a replacement that agrees with it
+        # up to path[i - 1]), or None to stop the robot where it stands.
+        self.route_check = None
+        # Called once every robot has arrived or stopped
+        self.on_finished = None
+
+    @property
+    def running(self):
+        return bool(self.robots)
+
+    def add(self, item, path, complete=True):
+        if len(path) > 1 or (path and not complete):
+            self.robots.append([item, Trajectory(path, self.cell_size, complete)])
+        elif path:
+            self.place(item, *self.cell_centre(path[0]))
+
+    def extend(self, item, cells):
+        # Appends cells to the route of a robot added with complete=False
+        for robot in self.robots:
+            if robot[0] == item:
+                robot[1].extend(cells)
+
+    def finish(self, item):
+        # No more cells will be appended; the robot stops at the end of what it has
+        for robot in self.robots:
+            if robot[0] == item:
+                robot[1].complete = True
+
+    def start(self):
+        if self.job is None and self.robots and not self.paused:
+            self.last_tick = time.perf_counter()
+            self.job = self.canvas.after(self.frame_ms, self.tick)
+
+    def stop(self):
+        if self.job is not None:
+            self.canvas.after_cancel(self.job)
+            self.job = None
+        self.robots = []
+        self.paused = False
+
+    def pause(self):
+        # Nothing is scheduled while paused; resuming restarts the clock
+        self.paused = True
+        if self.job is not None:
+            self.canvas.after_cancel(self.job)
+            self.job = None
+
+    def resume(self):
+        self.paused = False
+        self.start()
+
+    def set_speed(self, factor):
+        self.speed_factor = factor
+
+    def tick(self):
+        self.job = None
+        now = time.perf_counter()
+        elapsed, self.last_tick = now - self.last_tick, now
+
+        step = elapsed * self.speed * self.speed_factor
+        self.robots = [robot for robot in self.robots if self.advance(robot, step)]
+
+        if self.robots:
+            spent_ms = (time.perf_counter() - now) * 1000
+            self.job = self.canvas.after(max(int(self.frame_ms - spent_ms), 1), self.tick)
+        elif self.on_finished is not None:
+            self.on_finished()
+
+    def advance(self, robot, step):
+        # Moves one robot `step` pixels further; returns False once it has stopped
+        item, trajectory = robot
+        trajectory.travelled += step
+        while True:
+            i = trajectory.segment
+            if i >= len(trajectory.path):
+                self.place(item, trajectory.xs[-1], trajectory.ys[-1])
+                if not trajectory.complete:
+                    # Caught up with the planner: wait here for the next leg
+                    trajectory.travelled = trajectory.distances[-1]
+                    return True
+                return False
+
+            if not trajectory.checked and self.route_check is not None:
+                path = self.route_check(trajectory.path, i)
+                if path is None:
+                    self.place(item, trajectory.xs[i - 1], trajectory.ys[i - 1])
+                    return False
+                if path is not trajectory.path:
+                    # Carry on along the new path from the cell the robot is standing on
+                    overshoot = trajectory.travelled - trajectory.distances[i - 1]
+                    trajectory = robot[1] = Trajectory(path[i - 1:], self.cell_size, trajectory.complete)
+                    trajectory.travelled = overshoot
+                    continue
+            trajectory.checked = True
+
+            distances = trajectory.distances
+            if trajectory.travelled < distances[i]:
+                break
+            trajectory.segment += 1
+            trajectory.checked = False
+
+        start, end = distances[i - 1], distances[i]
+        fraction = (trajectory.travelled - start) / (end - start) if end > start else 1.0
+        xs, ys = trajectory.xs, trajectory.ys
+        self.place(item, xs[i - 1] + (xs[i] - xs[i - 1]) * fraction, ys[i - 1] + (ys[i] - ys[i - 1]) * fraction)
+        return True
+
+    def cell_centre(self, cell):
+        half = self.cell_size / 2
+        return cell[1] * self.cell_size + half, cell[0] * self.cell_size + half
+
+    def place(self, item, x, y):
+        half = self.robot_size // 2
+        self.canvas.coords(item, x - half, y - half, x + half, y + half)
@@ -0,0 +1,88 @@
+# Any-angle routes: line-of-sight smoothing ("string pulling") of grid paths.
+#
+# A grid path only moves in eight directions, so a route across open sand is a staircase
+# of short steps. Smoothing walks along a solved path and keeps a waypoint only where the
+# robot can no longer see the next cells of the path from the last waypoint kept: it heads
+# straight from waypoint to waypoint, cell centre to cell centre, over far fewer and longer
+# segments, and the route is never longer than the grid path it came from.
+#
+# A straight segment is clear when every cell it passes through is free. Where it passes
+# exactly through a cell corner it squeezes between the two cells beside that corner, which
+# is only allowed when they are free too unless the corner rule allows cutting corners, just
+# like a diagonal grid move. On weighted terrain a segment must also stay on sand of a single
+# cost, and is only taken when it costs no more than the stretch of path it replaces.
+#
+# This is a post-pass over the legs any engine returns, so it also works on cached legs,
+# JPS, HPA* and ALT routes. Each leg is smoothed on its own, so the robot still stops at
+# every piece of trash.
+#
+# Reference: Nash & Koenig, "Any-Angle Path Planning" (AI Magazine 2013).
+
+import math
+
+# Slack for comparing the cost of a shortcut with the summed step costs it replaces
+COST_TOLERANCE = 1e-9
+
+
+def line_of_sight(astar, start, end, terrain_cost=None):
+    # Whether the robot can go straight from the centre of cell start to the centre of cell
+    # end. With terrain_cost set, every cell on the way must also cost exactly that much
+    (x, y), (x1, y1) = start, end
+    cols, obstacles, terrain = astar.cols, astar.obstacles, astar.terrain
+    corner_cutting = astar.allow_corner_cutting
+    dx, dy = abs(x1 - x), abs(y1 - y)
+    step_x = 1 if x1 > x else -1
+    step_y = 1 if y1 > y else -1
+    # Which grid line the segment crosses next: positive means a row boundary (x changes),
+    # negative a column boundary, zero a cell corner
+    error = dx - dy
+    dx, dy = 2 * dx, 2 * dy
+
+    while x != x1 or y != y1:
+        if error > 0:
+            x += step_x
+            error -= dy
+        elif error < 0:
+            y += step_y
+            error += dx
+        else:
+            if not corner_cutting and (obstacles[(x + step_x) * cols + y] or obstacles[x * cols + y + step_y]):
+                return False
+            x += step_x
+            y += step_y
+            error += dx - dy
+        index = x * cols + y
+        if obstacles[index] or (terrain_cost is not None and terrain[index] != terrain_cost):
+            return False
+    return True
+
+
+def smooth_path(astar, path):
+    # The waypoints of path the robot actually has to turn at, first and last cell included
+    if len(path) < 3:
+        return list(path)
+
+    weighted = astar.weighted
+    if weighted:
+        # Cost of the grid path up to each cell, to check shortcuts against
+        terrain, cols = astar.terrain, astar.cols
+        travelled = [0.0]
+        for i in range(1, len(path)):
+            travelled.append(travelled[-1] + astar.path_cost(path[i - 1:i + 1]))
+
+    waypoints = [path[0]]
+    anchor = 0
+    for i in range(2, len(path)):
+        if weighted:
+            ax, ay = path[anchor]
+            cost = terrain[ax * cols + ay]
+            visible = line_of_sight(astar, path[anchor], path[i], cost) and (
+                math.hypot(path[i][0] - ax, path[i][1] - ay) * cost <=
+                travelled[i] - travelled[anchor] + COST_TOLERANCE)
+        else:
+            visible = line_of_sight(astar, path[anchor], path[i])
+        if not visible:
+            anchor = i - 1
+            waypoints.append(path[anchor])
+    waypoints.append(path[-1])
+    return waypoints
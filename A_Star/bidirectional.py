@@ -0,0 +1,142 @@
+# Bidirectional A* for long legs.
+#
+# One search grows from the start towards the end and one from the end towards the start,
+# each with its own octile heuristic, and the shorter open set is always expanded next.
+# mu tracks the cheapest start-to-end route seen where the two searches touch. Because both
+# heuristics are consistent, once the smallest f-value in either open set reaches mu no
+# unexplored route can beat it, so stopping there keeps the result optimal.
+#
+# The forward search uses the pathfinder's own search arrays; the backward search keeps a
+# second, lazily allocated set of the same generation-stamped arrays.
+
+import heapq
+from array import array
+
+from adjacency import UNBUILT
+from cost_model import INF, MAX_GENERATION, octile_distance
+
+
+class ReverseSearchState:
+    def __init__(self, size):
+        self.generation = 0
+        self.g_costs = array("d", [INF]) * size
+        self.parents = array("i", [-1]) * size
+        self.search_stamps = array("I", [0]) * size
+        self.closed_stamps = array("I", [0]) * size
+
+    def begin_search(self):
+        self.generation += 1
+        if self.generation > MAX_GENERATION:
+            size = len(self.g_costs)
+            self.search_stamps = array("I", [0]) * size
+            self.closed_stamps = array("I", [0]) * size
+            self.generation = 1
+        return self.generation
+
+
+class _Side:
+    # Everything one direction of the search needs, bundled so both loops share the code
+    def __init__(self, g_costs, parents, stamps, closed, generation, target_index, cols):
+        self.g_costs = g_costs
+        self.parents = parents
+        self.stamps = stamps
+        self.closed = closed
+        self.generation = generation
+        self.target_x, self.target_y = divmod(target_index, cols)
+        self.open_set = []
+        self.expanded = 0
+
+    def reached(self, index):
+        return self.stamps[index] == self.generation
+
+    def top_f_cost(self):
+        # Drop stale entries so the heap top is a live f-value
+        open_set = self.open_set
+        while open_set:
+            _, _, g_cost, index = open_set[0]
+            if self.closed[index] == self.generation or g_cost != self.g_costs[index]:
+                heapq.heappop(open_set)
+                continue
+            return open_set[0][0]
+        return INF
+
+
+def bidirectional_search(astar, start_index, end_index):
+    cols = astar.cols
+    size = astar.rows * cols
+    if start_index == end_index:
+        astar.expanded_count = 0
+        astar.expanded_per_direction = (0, 0)
+        astar.last_cost = 0.0
+        return [divmod(start_index, cols)]
+
+    reverse = getattr(astar, "reverse_search_state", None)
+    if reverse is None or len(reverse.g_costs) != size:
+        reverse = astar.reverse_search_state = ReverseSearchState(size)
+
+    forward = _Side(astar.g_costs, astar.parents, astar.search_stamps, astar.closed_stamps,
+                    astar.begin_search(), end_index, cols)
+    backward = _Side(reverse.g_costs, reverse.parents, reverse.search_stamps, reverse.closed_stamps,
+                     reverse.begin_search(), start_index, cols)
+
+    for side, origin in ((forward, start_index), (backward, end_index)):
+        side.stamps[origin] = side.generation
+        side.g_costs[origin] = 0.0
+        side.parents[origin] = -1
+        side.open_set.append((0.0, 0.0, 0.0, origin))
+    h_scale = astar.min_terrain
+    graph = astar.compiled_graph()
+    masks, moves, fill, terrain = graph.masks, graph.moves, graph.fill, astar.terrain
+
+    best_cost, meeting_index = INF, -1
+    while True:
+        forward_top, backward_top = forward.top_f_cost(), backward.top_f_cost()
+        if forward_top >= best_cost or backward_top >= best_cost:
+            break
+
+        if len(forward.open_set) <= len(backward.open_set):
+            side, other = forward, backward
+        else:
+            side, other = backward, forward
+
+        _, _, g_cost, index = heapq.heappop(side.open_set)
+        side.closed[index] = side.generation
+        side.expanded += 1
+
+        mask = masks[index]
+        if mask == UNBUILT:
+            mask = fill(index)
+        here = terrain[index]
+        for offset, half_length in moves[mask]:
+            neighbor = index + offset
+            if side.closed[neighbor] == side.generation:
+                continue
+
+            tentative_g_cost = g_cost + half_length * (here + terrain[neighbor])
+            if not side.reached(neighbor):
+                side.stamps[neighbor] = side.generation
+            elif tentative_g_cost >= side.g_costs[neighbor]:
+                continue
+
+            side.parents[neighbor] = index
+            side.g_costs[neighbor] = tentative_g_cost
+            nx, ny = divmod(neighbor, cols)
+            h_cost = octile_distance(nx, ny, side.target_x, side.target_y) * h_scale
+            heapq.heappush(side.open_set, (tentative_g_cost + h_cost, h_cost, tentative_g_cost, neighbor))
+
+            if other.reached(neighbor) and tentative_g_cost + other.g_costs[neighbor] < best_cost:
+                best_cost = tentative_g_cost + other.g_costs[neighbor]
+                meeting_index = neighbor
+
+    astar.expanded_per_direction = (forward.expanded, backward.expanded)
+    astar.expanded_count = forward.expanded + backward.expanded
+    astar.last_cost = best_cost
+    if meeting_index < 0:
+        return None
+
+    path = astar.reconstruct_indices(meeting_index)
+    index = reverse.parents[meeting_index]
+    while index >= 0:
+        path.append(divmod(index, cols))
+        index = reverse.parents[index]
+    return path
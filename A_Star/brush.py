@@ -0,0 +1,96 @@
+# Obstacle painting for the tkinter GUIs.
+#
+# Tk only reports the pointer every few milliseconds, so a fast drag jumps over cells. The
+# brush keeps the cells that motion events land on in a buffer, and on the next idle callback
+# joins them up with Bresenham lines and grows every line cell to the brush size. Those cells
+# go to preview(cells, erase) straight away, so the renderer can show the stroke as it is
+# drawn, and are collected for the whole stroke. On release the stroke is handed to
+# apply(cells, erase) at once: one bulk update of the grid, with one grid-version bump, however
+# many events and idle callbacks it took.
+
+def line_cells(x0, y0, x1, y1):
+    # Bresenham: every cell on the straight line from (x0, y0) to (x1, y1), both included
+    dx, dy = abs(x1 - x0), -abs(y1 - y0)
+    step_x = 1 if x0 < x1 else -1
+    step_y = 1 if y0 < y1 else -1
+    error = dx + dy
+    cells = []
+    while True:
+        cells.append((x0, y0))
+        if x0 == x1 and y0 == y1:
+            return cells
+        double = 2 * error
+        if double >= dy:
+            error += dy
+            x0 += step_x
+        if double <= dx:
+            error += dx
+            y0 += step_y
+
+
+class ObstacleBrush:
+    def __init__(self, canvas, rows, cols, apply, preview=None, size=1):
+        # apply(cells, erase) receives each finished stroke and preview(cells, erase) the cells
+        # added to it since the last idle callback, both as lists of distinct (x, y) grid cells
+        self.canvas = canvas
+        self.rows = rows
+        self.cols = cols
+        self.apply = apply
+        self.preview = preview
+        self.size = size  # Brush width and height in cells
+        self.erase = False
+        self.pending = []  # Cells the pointer passed since the last flush
+        self.last = None  # Last cell of the stroke already painted
+        self.stroke = []  # Cells of the stroke so far, in painting order
+        self.stroke_cells = set()
+        self.flush_job = None
+
+    def press(self, x, y):
+        self.last = None
+        self.stroke, self.stroke_cells = [], set()
+        self.drag(x, y)
+
+    def drag(self, x, y):
+        if self.pending and self.pending[-1] == (x, y):
+            return
+        self.pending.append((x, y))
+        if self.flush_job is None:
+            self.flush_job = self.canvas.after_idle(self.flush)
+
+    def release(self):
+        if self.flush_job is not None:
+            self.canvas.after_cancel(self.flush_job)
+        self.flush()
+        cells = self.stroke
+        self.last = None
+        self.stroke, self.stroke_cells = [], set()
+        if cells:
+            self.apply(cells, self.erase)
+
+    def flush(self):
+        self.flush_job = None
+        if not self.pending:
+            return
+        points = self.pending
+        self.pending = []
+        if self.last is not None:
+            points.insert(0, self.last)
+        self.last = points[-1]
+
+        line = [points[0]]
+        for (x0, y0), (x1, y1) in zip(points, points[1:]):
+            line.extend(line_cells(x0, y0, x1, y1)[1:])
+
+        # Square brush centred on each line cell; an even size reaches one cell further down and right
+        low = -((self.size - 1) // 2)
+        high = low + self.size
+        cells, seen = [], self.stroke_cells
+        for x, y in line:
+            for bx in range(max(x + low, 0), min(x + high, self.rows)):
+                for by in range(max(y + low, 0), min(y + high, self.cols)):
+                    if (bx, by) not in seen:
+                        seen.add((bx, by))
+                        cells.append((bx, by))
+        self.stroke.extend(cells)
+        if cells and self.preview is not None:
+            self.preview(cells, self.erase)
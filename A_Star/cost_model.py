@@ -0,0 +1,32 @@
+# Movement rules and costs shared by every search engine
+
+import math
+
+INF = float("inf")
+
+# Largest generation an array("I") stamp can hold before it wraps
+MAX_GENERATION = 2 ** 32 - 1
+
+# Movement in all eight directions, as (dx, dy) pairs
+DIRECTIONS = ((-1, 0), (0, 1), (1, 0), (0, -1), (-1, -1), (-1, 1), (1, 1), (1, -1))
+
+STRAIGHT_COST = 1.0
+DIAGONAL_COST = math.sqrt(2)
+# On weighted terrain a move costs its length times the mean cost of its two cells,
+# computed everywhere as HALF_..._COST * (cost_a + cost_b) so every engine gets the same sum
+HALF_STRAIGHT_COST = STRAIGHT_COST * 0.5
+HALF_DIAGONAL_COST = DIAGONAL_COST * 0.5
+
+# Landmark bounds (see landmarks.py) are differences of long sums, so they can overshoot the
+# true cost by a rounding error; shaving this much off keeps them admissible
+ROUNDING_SLACK = 1e-9
+
+# Terrain cost multipliers: how much longer a robot takes to cross a cell than on dry sand
+TERRAIN_COSTS = {"dry sand": 1.0, "wet sand": 2.0, "soft sand": 3.0}
+
+
+def octile_distance(x1, y1, x2, y2):
+    # Exact cost of the cheapest 8-connected route with no obstacles in the way
+    dx = abs(x1 - x2)
+    dy = abs(y1 - y2)
+    return STRAIGHT_COST * max(dx, dy) + (DIAGONAL_COST - STRAIGHT_COST) * min(dx, dy)
@@ -0,0 +1,172 @@
+# One-to-many shortest-path costs for building destination distance matrices.
+#
+# A single Dijkstra wavefront from each destination settles every other destination in one
+# pass, so an N x N matrix takes at most N - 1 searches instead of N^2 / 2 separate A* runs.
+# Searches reuse the pathfinder's generation-stamped g/parent arrays, so none of them sweeps
+# the grid to reset.
+
+import heapq
+from array import array
+
+from adjacency import UNBUILT
+from cost_model import INF
+
+
+def distance_field(astar, source_index, targets):
+    # Dijkstra from source_index that stops once every index in targets is settled.
+    # Returns {target index: cost}; unreachable targets are left out. The search tree stays
+    # in astar.parents until the next search starts.
+    generation = astar.begin_search()
+    g_costs, parents = astar.g_costs, astar.parents
+    stamps, closed = astar.search_stamps, astar.closed_stamps
+    # The wavefront expands most of the map, so it reads the neighbor graph directly
+    graph = astar.compiled_graph()
+    masks, moves, fill, terrain = graph.masks, graph.moves, graph.fill, astar.terrain
+
+    remaining = set(targets)
+    found = {}
+    expanded = 0
+
+    stamps[source_index] = generation
+    g_costs[source_index] = 0.0
+    parents[source_index] = -1
+    open_set = [(0.0, source_index)]
+
+    while open_set and remaining:
+        g_cost, index = heapq.heappop(open_set)
+        if closed[index] == generation or g_cost != g_costs[index]:
+            continue
+
+        closed[index] = generation
+        expanded += 1
+        if index in remaining:
+            remaining.discard(index)
+            found[index] = g_cost
+
+        mask = masks[index]
+        if mask == UNBUILT:
+            mask = fill(index)
+        here = terrain[index]
+        for offset, half_length in moves[mask]:
+            neighbor = index + offset
+            if closed[neighbor] == generation:
+                continue
+
+            tentative_g_cost = g_cost + half_length * (here + terrain[neighbor])
+            if stamps[neighbor] != generation:
+                stamps[neighbor] = generation
+            elif tentative_g_cost >= g_costs[neighbor]:
+                continue
+
+            parents[neighbor] = index
+            g_costs[neighbor] = tentative_g_cost
+            heapq.heappush(open_set, (tentative_g_cost, neighbor))
+
+    astar.expanded_count = expanded
+    return found
+
+
+def distance_array(astar, source_index):
+    # Dijkstra from source_index over everything it can reach, for tables that need the cost
+    # to every cell (e.g. landmarks). Returns an array indexed like the grid, INF where the
+    # source can't reach
+    generation = astar.begin_search()
+    g_costs, stamps, closed = astar.g_costs, astar.search_stamps, astar.closed_stamps
+    graph = astar.compiled_graph()
+    masks, moves, fill, terrain = graph.masks, graph.moves, graph.fill, astar.terrain
+
+    distances = array("d", [INF]) * len(masks)
+    expanded = 0
+    stamps[source_index] = generation
+    g_costs[source_index] = 0.0
+    open_set = [(0.0, source_index)]
+
+    while open_set:
+        g_cost, index = heapq.heappop(open_set)
+        if closed[index] == generation or g_cost != g_costs[index]:
+            continue
+        closed[index] = generation
+        distances[index] = g_cost
+        expanded += 1
+
+        mask = masks[index]
+        if mask == UNBUILT:
+            mask = fill(index)
+        here = terrain[index]
+        for offset, half_length in moves[mask]:
+            neighbor = index + offset
+            if closed[neighbor] == generation:
+                continue
+
+            tentative_g_cost = g_cost + half_length * (here + terrain[neighbor])
+            if stamps[neighbor] != generation:
+                stamps[neighbor] = generation
+            elif tentative_g_cost >= g_costs[neighbor]:
+                continue
+            g_costs[neighbor] = tentative_g_cost
+            heapq.heappush(open_set, (tentative_g_cost, neighbor))
+
+    astar.expanded_count = expanded
+    return distances
+
+
+class DistanceMatrix:
+    # Dense matrix of shortest-path costs between cells. Indexing a DistanceMatrix gives a
+    # row of costs, so it can be passed straight to the tour optimizer. Paths are rebuilt
+    # only when path(i, j) is called, from a snapshot of the search tree of source i when
+    # keep_paths is set, or with a fresh run_path otherwise. With a parallel planner the rows
+    # are searched in its worker processes, which cannot hand their search trees back, so
+    # paths are not kept.
+
+    def __init__(self, astar, cells, keep_paths=True, parallel=None):
+        self.astar = astar
+        self.cells = list(cells)
+        self.keep_paths = keep_paths = keep_paths and parallel is None
+        n = len(self.cells)
+        self.distances = [[0.0 if i == j else INF for j in range(n)] for i in range(n)]
+        self.trees = [None] * n
+        self.expanded_count = 0
+
+        indices = [cell.index for cell in self.cells]
+        fields = parallel.distance_fields(indices) if parallel is not None else None
+        for i in range(n):
+            # The grid is undirected, so source i only has to reach the cells after it,
+            # except when paths are kept and its tree has to cover every cell
+            targets = indices if keep_paths else indices[i + 1:]
+            if not targets:
+                continue
+
+            if fields is not None:
+                found, expanded = fields[i]
+            else:
+                found = distance_field(astar, indices[i], targets)
+                expanded = astar.expanded_count
+            self.expanded_count += expanded
+            for j in range(n):
+                if indices[j] in found:
+                    self.distances[i][j] = self.distances[j][i] = found[indices[j]]
+            if keep_paths:
+                self.trees[i] = array("i", astar.parents)
+
+    def __len__(self):
+        return len(self.distances)
+
+    def __getitem__(self, i):
+        return self.distances[i]
+
+    def path(self, i, j):
+        if self.distances[i][j] == INF:
+            return None
+        if i == j:
+            return [(self.cells[i].x, self.cells[i].y)]
+
+        tree = self.trees[i]
+        if tree is None:
+            return self.astar.run_path(self.cells[i], self.cells[j])
+
+        path = []
+        index = self.cells[j].index
+        while index >= 0:
+            path.append(divmod(index, self.astar.cols))
+            index = tree[index]
+        return path[::-1]
@@ -0,0 +1,194 @@
+# D* Lite incremental replanning for a robot that is already on its way.
+#
+# D* Lite searches backwards from the goal, so the costs it has settled stay valid as the
+# robot moves. When obstacles appear or disappear it only re-examines the cells around the
+# edit and whatever part of the search depended on them, so a repair costs roughly the size
+# of the change rather than a fresh search over the map. State is kept in dictionaries that
+# only hold cells the search has actually touched.
+#
+# Reference: Koenig & Likhachev, "D* Lite" (AAAI 2002), optimized version.
+
+import heapq
+
+from cost_model import (DIAGONAL_COST, DIRECTIONS, HALF_DIAGONAL_COST, HALF_STRAIGHT_COST, INF, STRAIGHT_COST,
+                        octile_distance)
+
+# Keys and costs are sums of float step costs, and the same cost reached along different
+# cells can differ in the last bits. Values this close count as equal
+KEY_TOLERANCE = 1e-9
+
+
+class DStarLite:
+    def __init__(self, astar, start_index, goal_index):
+        self.astar = astar
+        self.start = start_index
+        self.goal = goal_index
+        self.last = start_index
+        self.km = 0.0
+        # Heuristic scale; a terrain edit that lowers min_terrain forces a fresh replanner
+        self.h_scale = astar.min_terrain
+
+        self.g = {}
+        self.rhs = {goal_index: 0.0}
+        self.open_keys = {goal_index: self.calculate_key(goal_index)}
+        self.open_set = [(self.open_keys[goal_index], goal_index)]
+
+        self.changed_cells = []
+        self.expanded_count = 0
+        astar.map_listeners.append(self.cells_changed)
+
+    def close(self):
+        if self.cells_changed in self.astar.map_listeners:
+            self.astar.map_listeners.remove(self.cells_changed)
+
+    # Graph
+
+    def neighbors(self, index):
+        # Every cell around index, blocked or not; blocked moves simply cost INF
+        rows, cols = self.astar.rows, self.astar.cols
+        x, y = divmod(index, cols)
+        for dx, dy in DIRECTIONS:
+            nx, ny = x + dx, y + dy
+            if 0 <= nx < rows and 0 <= ny < cols:
+                yield nx * cols + ny
+
+    def cost(self, a, b):
+        # Cost of the move from a to b. Like every other search, a blocked cell only loses the
+        # moves into it, so a robot standing on a cell that was painted over can still leave
+        astar = self.astar
+        obstacles, cols = astar.obstacles, astar.cols
+        if obstacles[b]:
+            return INF
+        ax, ay = divmod(a, cols)
+        bx, by = divmod(b, cols)
+        if ax == bx or ay == by:
+            if astar.weighted:
+                return HALF_STRAIGHT_COST * (astar.terrain[a] + astar.terrain[b])
+            return STRAIGHT_COST
+        if not astar.allow_corner_cutting and (obstacles[ax * cols + by] or obstacles[bx * cols + ay]):
+            return INF
+        if astar.weighted:
+            return HALF_DIAGONAL_COST * (astar.terrain[a] + astar.terrain[b])
+        return DIAGONAL_COST
+
+    def heuristic(self, index):
+        cols = self.astar.cols
+        x, y = divmod(index, cols)
+        sx, sy = divmod(self.start, cols)
+        return octile_distance(x, y, sx, sy) * self.h_scale
+
+    # Core
+
+    def calculate_key(self, index):
+        best = min(self.g.get(index, INF), self.rhs.get(index, INF))
+        return best + self.heuristic(index) + self.km, best
+
+    def update_vertex(self, index):
+        if index != self.goal:
+            self.rhs[index] = min((self.cost(index, neighbor) + self.g.get(neighbor, INF)
+                                   for neighbor in self.neighbors(index)), default=INF)
+        self.queue(index)
+
+    def queue(self, index):
+        # Put index on the open set with a fresh key if it is inconsistent, else take it off
+        self.open_keys.pop(index, None)
+        if self.g.get(index, INF) != self.rhs.get(index, INF):
+            key = self.calculate_key(index)
+            self.open_keys[index] = key
+            heapq.heappush(self.open_set, (key, index))
+
+    def top_key(self):
+        # Drop entries whose cell left the queue or was re-queued with another key
+        while self.open_set:
+            key, index = self.open_set[0]
+            if self.open_keys.get(index) == key:
+                return key
+            heapq.heappop(self.open_set)
+        return INF, INF
+
+    def compute_shortest_path(self):
+        # Every key within rounding of the start's is expanded, whatever its tie-breaker: the
+        # heap orders keys exactly, so a key that looks larger by a few bits can sit in front
+        # of one that needs expanding and stopping there leaves stale costs around the start
+        while True:
+            top_key = self.top_key()
+            if not self.open_set or (
+                    top_key[0] > self.calculate_key(self.start)[0] + KEY_TOLERANCE and
+                    self.rhs.get(self.start, INF) <= self.g.get(self.start, INF) + KEY_TOLERANCE):
+                break
+            old_key, index = heapq.heappop(self.open_set)
+            new_key = self.calculate_key(index)
+            self.expanded_count += 1
+
+            if old_key < new_key:
+                self.open_keys[index] = new_key
+                heapq.heappush(self.open_set, (new_key, index))
+            elif self.g.get(index, INF) > self.rhs.get(index, INF):
+                # Cost settled: the cells around can only get cheaper through it, which is one
+                # comparison each instead of a minimum over all their neighbors
+                g_cost = self.g[index] = self.rhs[index]
+                del self.open_keys[index]
+                for neighbor in self.neighbors(index):
+                    if neighbor != self.goal:
+                        through = self.cost(neighbor, index) + g_cost
+                        if through < self.rhs.get(neighbor, INF):
+                            self.rhs[neighbor] = through
+                            self.queue(neighbor)
+            else:
+                # Cost went up: only the cells whose best move led through index need a
+                # fresh minimum
+                old_g_cost = self.g[index]
+                self.g[index] = INF
+                self.update_vertex(index)
+                for neighbor in self.neighbors(index):
+                    if (neighbor != self.goal and
+                            self.rhs.get(neighbor, INF) >= self.cost(neighbor, index) + old_g_cost - KEY_TOLERANCE):
+                        self.update_vertex(neighbor)
+
+    # Robot-facing API
+
+    def cells_changed(self, cells):
+        self.changed_cells.extend(cells)
+
+    def replan(self, current_index):
+        # Repair the search for edits seen since the last call and return the cell-by-cell
+        # route from current_index to the goal, or None if the goal is cut off
+        if current_index != self.last:
+            cols = self.astar.cols
+            lx, ly = divmod(self.last, cols)
+            cx, cy = divmod(current_index, cols)
+            self.km += octile_distance(lx, ly, cx, cy) * self.h_scale
+            self.last = current_index
+        self.start = current_index
+
+        cols = self.astar.cols
+        touched = set()
+        for x, y in self.changed_cells:
+            index = x * cols + y
+            touched.add(index)
+            touched.update(self.neighbors(index))
+        self.changed_cells = []
+        for index in touched:
+            self.update_vertex(index)
+
+        self.expanded_count = 0
+        self.compute_shortest_path()
+        return self.extract_path()
+
+    def extract_path(self):
+        # The start may be left locally underconsistent, so its rhs is the reliable cost
+        if self.rhs.get(self.start, INF) == INF:
+            return None
+
+        cols = self.astar.cols
+        path = [divmod(self.start, cols)]
+        index, visited = self.start, {self.start}
+        while index != self.goal:
+            current = index
+            index = min(self.neighbors(current),
+                        key=lambda neighbor: self.cost(current, neighbor) + self.g.get(neighbor, INF))
+            if index in visited or self.g.get(index, INF) == INF:
+                return None
+            visited.add(index)
+            path.append(divmod(index, cols))
+        return path
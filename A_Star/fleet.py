@@ -0,0 +1,138 @@
+# Fleet planning: several robots share the trash on one beach.
+#
+# Each robot starts at its own cell (or all of them at one depot) and finishes at the common
+# end cell. The beach is only clean once the last robot arrives, so the trash is split to
+# minimise the makespan, the length of the longest route, rather than the total distance.
+#
+# One distance matrix over the starts, the trash and the end gives exact path costs. Trash is
+# handed out farthest-first, each piece to the robot whose route stays shortest after its
+# cheapest insertion, which grows the routes like clusters around the robots. Single pieces
+# are then moved off the longest route while that lowers the makespan, and finally every
+# robot's visiting order is optimised on its own. The robots' legs are independent, so with
+# astar.workers > 1 they are all solved together in the process pool.
+
+from cost_model import INF
+from tour import optimize_tour, tour_length, two_opt
+
+
+def fleet_starts(astar):
+    # One start cell per robot; robots share start cells in turn when there are fewer
+    starts = astar.robot_starts or [astar.start]
+    return [starts[i % len(starts)] for i in range(max(astar.robot_count, len(astar.robot_starts)))]
+
+
+def cheapest_insertion(route, node, dist):
+    # (added length, position) for inserting node between two stops of route
+    return min((dist[route[i - 1]][node] + dist[node][route[i]] - dist[route[i - 1]][route[i]], i)
+               for i in range(1, len(route)))
+
+
+def partition_trash(dist, starts, trash, end):
+    # Routes as lists of matrix nodes from a start to end, with the trash split between them
+    routes = [[start, end] for start in starts]
+    lengths = [dist[start][end] for start in starts]
+
+    for node in sorted(trash, key=lambda node: (-min(dist[start][node] for start in starts), node)):
+        best = None
+        for robot, route in enumerate(routes):
+            added, position = cheapest_insertion(route, node, dist)
+            if best is None or lengths[robot] + added < best[0]:
+                best = (lengths[robot] + added, robot, position)
+        length, robot, position = best
+        routes[robot].insert(position, node)
+        lengths[robot] = length
+
+    # Move single pieces off the longest route while that shortens the longest route
+    improved = True
+    while improved and len(routes) > 1:
+        improved = False
+        longest = max(range(len(routes)), key=lambda robot: lengths[robot])
+        makespan = lengths[longest]
+        route = routes[longest]
+        for i in range(1, len(route) - 1):
+            node = route[i]
+            removed = dist[route[i - 1]][route[i + 1]] - dist[route[i - 1]][node] - dist[node][route[i + 1]]
+            for robot, other in enumerate(routes):
+                if robot == longest:
+                    continue
+                added, position = cheapest_insertion(other, node, dist)
+                if max(makespan + removed, lengths[robot] + added) < makespan - 1e-9:
+                    del route[i]
+                    other.insert(position, node)
+                    routes[longest] = two_opt(route, dist)
+                    routes[robot] = two_opt(other, dist)
+                    lengths[longest] = tour_length(routes[longest], dist)
+                    lengths[robot] = tour_length(routes[robot], dist)
+                    improved = True
+                    break
+            if improved:
+                break
+    return routes
+
+
+def optimize_route(route, dist):
+    nodes = list(route)
+    order = optimize_tour([[dist[a][b] for b in nodes] for a in nodes])
+    return [nodes[i] for i in order]
+
+
+def plan_fleet(astar):
+    # Returns one cell-by-cell path per robot (waypoints with astar.any_angle), or None if some
+    # trash can't be reached.
+    # Sets astar.fleet_stops (each robot's stops after its start), astar.makespan and
+    # astar.fleet_distance; route_stops holds every robot's stops for repair_route.
+    starts = fleet_starts(astar)
+    cells, position = [], {}
+    for cell in starts + astar.trash_positions + [astar.end]:
+        if cell.index not in position:
+            position[cell.index] = len(cells)
+            cells.append(cell)
+
+    astar.close_replanners()
+    astar.fleet_stops, astar.route_stops = [], []
+    astar.makespan = astar.fleet_distance = 0.0
+
+    dist = astar.distance_matrix(cells)
+    start_nodes = [position[cell.index] for cell in starts]
+    trash_nodes = [position[cell.index] for cell in astar.trash_positions]
+    end_node = position[astar.end.index]
+    if any(dist[start_nodes[0]][node] == INF for node in range(len(cells))):
+        return None  # Something is cut off from the first robot, so the grid is split
+
+    routes = partition_trash(dist, start_nodes, trash_nodes, end_node)
+    if astar.optimize_order:
+        routes = [optimize_route(route, dist) for route in routes]
+    lengths = [tour_length(route, dist) for route in routes]
+    astar.makespan = max(lengths)
+    astar.fleet_distance = sum(lengths)
+    astar.fleet_stops = [[cells[node] for node in route[1:]] for route in routes]
+    astar.route_stops = [cell for stops in astar.fleet_stops for cell in stops]
+
+    pairs = [(cells[a], cells[b]) for route in routes for a, b in zip(route, route[1:])]
+    planner = astar.parallel_planner()
+    if planner is not None:
+        legs = planner.solve_pairs(pairs)
+    else:
+        legs = [astar.run_path(start, end) for start, end in pairs]
+
+    if astar.any_angle:
+        from any_angle import smooth_path
+        legs = [leg and smooth_path(astar, leg) for leg in legs]
+
+    paths, legs = [], iter(legs)
+    for route in routes:
+        path = []
+        for _ in range(len(route) - 1):
+            leg = next(legs)
+            if not leg:
+                return None
+            path.extend(leg[:-1])
+        path.append((cells[route[-1]].x, cells[route[-1]].y))
+        paths.append(path)
+
+    if astar.any_angle:
+        # Smoothed routes are shorter than the grid costs the trash was split by
+        lengths = [astar.path_cost(path) for path in paths]
+        astar.makespan = max(lengths)
+        astar.fleet_distance = sum(lengths)
+    return paths
@@ -0,0 +1,356 @@
+# Hierarchical pathfinding (HPA*) for large maps.
+#
+# The grid is split into square clusters. Wherever two neighbouring clusters share a run of
+# free cells along their border we place entrance nodes (one in the middle of short runs,
+# one at each end of long ones), and inside every cluster we precompute the shortest-path
+# cost between its entrances. A query then connects the start and end to the entrances of
+# their own clusters, searches the small abstract graph, and only refines the chosen
+# abstract edges back into cells with searches that never leave a single cluster.
+#
+# Routes are near-optimal rather than optimal. If the abstract graph has no route (for
+# example when the only way across a border is a diagonal squeeze) the query falls back to
+# a flat search, so nothing reachable is ever reported as unreachable.
+#
+# Obstacle edits only mark the touched cluster (and the borders the cell sits on) dirty;
+# the next query rebuilds those borders and the clusters on either side of them.
+
+import heapq
+
+from adjacency import UNBUILT
+from cost_model import HALF_STRAIGHT_COST, INF, octile_distance
+
+# Runs of border cells at least this long get an entrance at each end instead of one
+LONG_ENTRANCE = 6
+
+
+class HierarchicalPathfinder:
+    def __init__(self, astar, cluster_size=16):
+        self.astar = astar
+        self.cluster_size = cluster_size
+        self.cluster_rows = -(-astar.rows // cluster_size)
+        self.cluster_cols = -(-astar.cols // cluster_size)
+
+        # border key -> list of (cell index, cell index) transitions across that border
+        self.borders = {}
+        # cluster -> {entrance index: [(entrance index, cost), ...]}
+        self.intra_edges = {}
+        # entrance index -> [(entrance index in the neighbouring cluster, cost), ...]
+        self.inter_edges = {}
+
+        self.dirty_clusters = set()
+        self.dirty_borders = set()
+        self.built_for = None
+        self.expanded_count = 0
+        astar.map_listeners.append(self.mark_dirty)
+
+    # Geometry
+
+    def cluster_of(self, index):
+        x, y = divmod(index, self.astar.cols)
+        return x // self.cluster_size, y // self.cluster_size
+
+    def cluster_bounds(self, cluster):
+        cx, cy = cluster
+        size = self.cluster_size
+        return (cx * size, min((cx + 1) * size, self.astar.rows) - 1,
+                cy * size, min((cy + 1) * size, self.astar.cols) - 1)
+
+    def cluster_borders(self, cluster):
+        # Border keys are ("row", cx, cy) between (cx, cy) and (cx + 1, cy), and
+        # ("col", cx, cy) between (cx, cy) and (cx, cy + 1)
+        cx, cy = cluster
+        keys = []
+        if cx > 0:
+            keys.append(("row", cx - 1, cy))
+        if cx < self.cluster_rows - 1:
+            keys.append(("row", cx, cy))
+        if cy > 0:
+            keys.append(("col", cx, cy - 1))
+        if cy < self.cluster_cols - 1:
+            keys.append(("col", cx, cy))
+        return keys
+
+    @staticmethod
+    def border_clusters(key):
+        kind, cx, cy = key
+        return ((cx, cy), (cx + 1, cy)) if kind == "row" else ((cx, cy), (cx, cy + 1))
+
+    # Incremental maintenance
+
+    def mark_dirty(self, cells):
+        size = self.cluster_size
+        for x, y in cells:
+            cx, cy = x // size, y // size
+            self.dirty_clusters.add((cx, cy))
+            # Cells on a cluster edge can also change the entrances on that border
+            if x % size == 0 and cx > 0:
+                self.dirty_borders.add(("row", cx - 1, cy))
+            if x % size == size - 1 and cx < self.cluster_rows - 1:
+                self.dirty_borders.add(("row", cx, cy))
+            if y % size == 0 and cy > 0:
+                self.dirty_borders.add(("col", cx, cy - 1))
+            if y % size == size - 1 and cy < self.cluster_cols - 1:
+                self.dirty_borders.add(("col", cx, cy))
+
+    def ensure_built(self):
+        if self.built_for != self.astar.allow_corner_cutting:
+            self.build()
+        elif self.dirty_clusters or self.dirty_borders:
+            self.rebuild(self.dirty_clusters, self.dirty_borders)
+
+    def build(self):
+        clusters = [(cx, cy) for cx in range(self.cluster_rows) for cy in range(self.cluster_cols)]
+        borders = {key for cluster in clusters for key in self.cluster_borders(cluster)}
+        self.borders, self.intra_edges = {}, {}
+        self.rebuild(clusters, borders)
+        self.built_for = self.astar.allow_corner_cutting
+
+    def rebuild(self, clusters, borders):
+        clusters = set(clusters)
+        for key in borders:
+            self.borders[key] = self.find_transitions(key)
+            clusters.update(self.border_clusters(key))
+
+        self.inter_edges = {}
+        terrain = self.astar.terrain
+        for transitions in self.borders.values():
+            for a, b in transitions:
+                cost = HALF_STRAIGHT_COST * (terrain[a] + terrain[b])
+                self.inter_edges.setdefault(a, []).append((b, cost))
+                self.inter_edges.setdefault(b, []).append((a, cost))
+
+        for cluster in clusters:
+            self.intra_edges[cluster] = self.connect_cluster(cluster)
+
+        self.dirty_clusters = set()
+        self.dirty_borders = set()
+
+    def find_transitions(self, key):
+        kind, cx, cy = key
+        astar = self.astar
+        cols, obstacles = astar.cols, astar.obstacles
+        x0, x1, y0, y1 = self.cluster_bounds((cx, cy))
+
+        if kind == "row":
+            pairs = [(x1 * cols + y, (x1 + 1) * cols + y) for y in range(y0, y1 + 1)]
+        else:
+            pairs = [(x * cols + y1, x * cols + y1 + 1) for x in range(x0, x1 + 1)]
+
+        transitions, run = [], []
+        for pair in pairs + [None]:
+            if pair is not None and not obstacles[pair[0]] and not obstacles[pair[1]]:
+                run.append(pair)
+                continue
+            if run:
+                if len(run) < LONG_ENTRANCE:
+                    transitions.append(run[len(run) // 2])
+                else:
+                    transitions.extend((run[0], run[-1]))
+                run = []
+        return transitions
+
+    def cluster_entrances(self, cluster):
+        entrances = set()
+        for key in self.cluster_borders(cluster):
+            for a, b in self.borders.get(key, ()):
+                entrances.add(a if self.cluster_of(a) == cluster else b)
+        return entrances
+
+    def connect_cluster(self, cluster):
+        entrances = self.cluster_entrances(cluster)
+        # Costs are symmetric, so each entrance only searches for the ones after it
+        ordered = sorted(entrances)
+        edges = {entrance: [] for entrance in ordered}
+        for i, entrance in enumerate(ordered[:-1]):
+            costs = self.cluster_costs(entrance, ordered[i + 1:], cluster)
+            for other, cost in costs.items():
+                edges[entrance].append((other, cost))
+                edges[other].append((entrance, cost))
+        return edges
+
+    # Searches confined to one cluster
+
+    def cluster_costs(self, source, targets, cluster):
+        # Dijkstra from source that never leaves the cluster; returns {target: cost}
+        astar = self.astar
+        x0, x1, y0, y1 = self.cluster_bounds(cluster)
+        cols = astar.cols
+        graph = astar.compiled_graph()
+        masks, moves, fill, terrain = graph.masks, graph.moves, graph.fill, astar.terrain
+        generation = astar.begin_search()
+        g_costs, stamps, closed = astar.g_costs, astar.search_stamps, astar.closed_stamps
+
+        remaining = set(targets)
+        found = {}
+        stamps[source] = generation
+        g_costs[source] = 0.0
+        open_set = [(0.0, source)]
+
+        while open_set and remaining:
+            g_cost, index = heapq.heappop(open_set)
+            if closed[index] == generation or g_cost != g_costs[index]:
+                continue
+            closed[index] = generation
+            if index in remaining:
+                remaining.discard(index)
+                found[index] = g_cost
+
+            mask = masks[index]
+            if mask == UNBUILT:
+                mask = fill(index)
+            here = terrain[index]
+            for offset, half_length in moves[mask]:
+                neighbor = index + offset
+                nx, ny = divmod(neighbor, cols)
+                if nx < x0 or nx > x1 or ny < y0 or ny > y1 or closed[neighbor] == generation:
+                    continue
+                tentative_g_cost = g_cost + half_length * (here + terrain[neighbor])
+                if stamps[neighbor] != generation:
+                    stamps[neighbor] = generation
+                elif tentative_g_cost >= g_costs[neighbor]:
+                    continue
+                g_costs[neighbor] = tentative_g_cost
+                heapq.heappush(open_set, (tentative_g_cost, neighbor))
+
+        return found
+
+    def cluster_path(self, start_index, end_index, cluster):
+        # A* between two cells of the same cluster that never leaves it
+        astar = self.astar
+        x0, x1, y0, y1 = self.cluster_bounds(cluster)
+        cols = astar.cols
+        end_x, end_y = divmod(end_index, cols)
+        h_scale = astar.min_terrain
+        generation = astar.begin_search()
+        g_costs, parents = astar.g_costs, astar.parents
+        stamps, closed = astar.search_stamps, astar.closed_stamps
+        graph = astar.compiled_graph()
+        masks, moves, fill, terrain = graph.masks, graph.moves, graph.fill, astar.terrain
+
+        stamps[start_index] = generation
+        g_costs[start_index] = 0.0
+        parents[start_index] = -1
+        open_set = [(0.0, 0.0, 0.0, start_index)]
+
+        while open_set:
+            _, _, g_cost, index = heapq.heappop(open_set)
+            if closed[index] == generation or g_cost != g_costs[index]:
+                continue
+            if index == end_index:
+                return astar.reconstruct_indices(index)
+            closed[index] = generation
+
+            mask = masks[index]
+            if mask == UNBUILT:
+                mask = fill(index)
+            here = terrain[index]
+            for offset, half_length in moves[mask]:
+                neighbor = index + offset
+                nx, ny = divmod(neighbor, cols)
+                if not (x0 <= nx <= x1 and y0 <= ny <= y1) or closed[neighbor] == generation:
+                    continue
+                tentative_g_cost = g_cost + half_length * (here + terrain[neighbor])
+                if stamps[neighbor] != generation:
+                    stamps[neighbor] = generation
+                elif tentative_g_cost >= g_costs[neighbor]:
+                    continue
+                parents[neighbor] = index
+                g_costs[neighbor] = tentative_g_cost
+                h_cost = octile_distance(nx, ny, end_x, end_y) * h_scale
+                heapq.heappush(open_set, (tentative_g_cost + h_cost, h_cost, tentative_g_cost, neighbor))
+
+        return None
+
+    # Queries
+
+    def find_path(self, start_index, end_index):
+        self.ensure_built()
+        astar = self.astar
+        cols = astar.cols
+        start_cluster, end_cluster = self.cluster_of(start_index), self.cluster_of(end_index)
+
+        # Temporary edges joining the start and end to the entrances of their clusters
+        start_links = self.cluster_costs(start_index, self.cluster_entrances(start_cluster) | {end_index},
+                                         start_cluster)
+        end_links = self.cluster_costs(end_index, self.cluster_entrances(end_cluster), end_cluster)
+
+        end_x, end_y = divmod(end_index, cols)
+        h_scale = astar.min_terrain
+        g_costs, parents, closed = {start_index: 0.0}, {start_index: None}, set()
+        open_set = [(0.0, 0.0, start_index)]
+        expanded = 0
+
+        while open_set:
+            _, g_cost, node = heapq.heappop(open_set)
+            if node in closed or g_cost != g_costs[node]:
+                continue
+            if node == end_index:
+                break
+            closed.add(node)
+            expanded += 1
+
+            if node == start_index:
+                # A start on a cluster border can also cross it straight away
+                edges = list(start_links.items()) + self.inter_edges.get(start_index, [])
+            else:
+                edges = self.intra_edges[self.cluster_of(node)].get(node, []) + self.inter_edges.get(node, [])
+                if node in end_links:
+                    edges = edges + [(end_index, end_links[node])]
+
+            for neighbor, edge_cost in edges:
+                if neighbor == node or neighbor in closed:
+                    continue
+                tentative_g_cost = g_cost + edge_cost
+                if tentative_g_cost >= g_costs.get(neighbor, INF):
+                    continue
+                g_costs[neighbor] = tentative_g_cost
+                parents[neighbor] = node
+                nx, ny = divmod(neighbor, cols)
+                heapq.heappush(open_set, (tentative_g_cost + octile_distance(nx, ny, end_x, end_y) * h_scale,
+                                          tentative_g_cost, neighbor))
+
+        self.expanded_count = expanded
+        if end_index not in parents:
+            return None
+
+        abstract_path = []
+        node = end_index
+        while node is not None:
+            abstract_path.append(node)
+            node = parents[node]
+        abstract_path.reverse()
+        return self.refine(abstract_path)
+
+    def refine(self, abstract_path):
+        path = [divmod(abstract_path[0], self.astar.cols)]
+        for a, b in zip(abstract_path, abstract_path[1:]):
+            cluster = self.cluster_of(a)
+            if cluster != self.cluster_of(b):
+                path.append(divmod(b, self.astar.cols))  # Step across a border
+                continue
+            segment = self.cluster_path(a, b, cluster)
+            path.extend(segment[1:])
+        return path
+
+
+def hierarchical_search(astar, start_index, end_index):
+    hierarchy = astar.hierarchy
+    if hierarchy is None or hierarchy.cluster_size != astar.cluster_size:
+        if hierarchy is not None:
+            astar.map_listeners.remove(hierarchy.mark_dirty)
+        hierarchy = astar.hierarchy = HierarchicalPathfinder(astar, astar.cluster_size)
+
+    # Short legs are cheap to search flat, and that is where abstract detours hurt most
+    start_x, start_y = divmod(start_index, astar.cols)
+    end_x, end_y = divmod(end_index, astar.cols)
+    if octile_distance(start_x, start_y, end_x, end_y) <= 2 * astar.cluster_size:
+        return astar.search(start_index, end_index)
+
+    path = hierarchy.find_path(start_index, end_index)
+    if path is None:
+        # The abstract graph only crosses borders on straight moves, so double-check
+        return astar.search(start_index, end_index)
+
+    astar.expanded_count = hierarchy.expanded_count
+    astar.last_cost = astar.path_cost(path)
+    return path
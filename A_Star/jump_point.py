@@ -0,0 +1,199 @@
+# Jump Point Search for uniform-cost 8-connected grids.
+#
+# Instead of pushing every neighbor, JPS scans along straight and diagonal lines and only
+# stops at cells where an optimal route may have to turn (a "forced" neighbor) or at the
+# goal. Large open sand areas therefore cost a few scans instead of thousands of heap
+# operations. Both movement rules of AStarPathfinding are supported: with corner cutting a
+# diagonal only needs its target cell free, without it both cells beside the move must be
+# free too. Returned paths are expanded back to cell-by-cell form and cost the same as A*.
+#
+# Straight scans do not depend on the goal, so like JPS+ their results are precomputed into
+# one jump-distance table per straight direction. The tables are built lazily in O(V) and
+# reused until the obstacle layout (grid_version) or the movement rules change, which makes
+# every straight jump O(1) and a diagonal jump linear in its own length.
+
+import heapq
+from array import array
+
+from cost_model import INF, octile_distance
+
+STRAIGHT_DIRECTIONS = ((-1, 0), (0, 1), (1, 0), (0, -1))
+
+
+def _sign(value):
+    return (value > 0) - (value < 0)
+
+
+def _build_jump_table(astar, dx, dy, walkable):
+    # Entry v for a cell moving in (dx, dy): v > 0 means a jump point v steps away,
+    # v <= 0 means -v free steps before the scan runs into a wall with no jump point.
+    rows, cols = astar.rows, astar.cols
+    corner_cutting = astar.allow_corner_cutting
+    table = array("i", [0]) * (rows * cols)
+    offset = dx * cols + dy
+    sides = ((dy, dx), (-dy, -dx))
+
+    # Walk against the direction so each cell's successor is already filled in
+    cells = range(rows * cols - 1, -1, -1) if offset > 0 else range(rows * cols)
+    for index in cells:
+        x, y = divmod(index, cols)
+        nx, ny = x + dx, y + dy
+        if not walkable(nx, ny):
+            continue
+
+        forced = False
+        for px, py in sides:
+            if corner_cutting:
+                if walkable(nx + dx + px, ny + dy + py) and not walkable(nx + px, ny + py):
+                    forced = True
+            elif walkable(nx + px, ny + py) and not walkable(x + px, y + py):
+                forced = True
+
+        if forced:
+            table[index] = 1
+        else:
+            following = table[index + offset]
+            table[index] = following + 1 if following > 0 else following - 1
+    return table
+
+
+def jump_tables(astar, walkable):
+    key = (astar.grid_version, astar.allow_corner_cutting)
+    cached = getattr(astar, "jump_table_cache", None)
+    if cached is None or cached[0] != key:
+        tables = {direction: _build_jump_table(astar, direction[0], direction[1], walkable)
+                  for direction in STRAIGHT_DIRECTIONS}
+        astar.jump_table_cache = cached = (key, tables)
+    return cached[1]
+
+
+def jump_point_search(astar, start_index, end_index):
+    rows, cols, obstacles = astar.rows, astar.cols, astar.obstacles
+    corner_cutting = astar.allow_corner_cutting
+    end_x, end_y = divmod(end_index, cols)
+
+    def walkable(x, y):
+        return 0 <= x < rows and 0 <= y < cols and not obstacles[x * cols + y]
+
+    tables = jump_tables(astar, walkable)
+
+    def jump_straight(x, y, dx, dy):
+        steps = tables[(dx, dy)][x * cols + y]
+        reach = steps if steps > 0 else -steps
+
+        # The goal only stops a scan that actually passes over it
+        if dx == 0 and x == end_x and 0 < (end_y - y) * dy <= reach:
+            return end_x, end_y
+        if dy == 0 and y == end_y and 0 < (end_x - x) * dx <= reach:
+            return end_x, end_y
+        if steps > 0:
+            return x + dx * steps, y + dy * steps
+        return None
+
+    def can_step_diagonally(x, y, dx, dy):
+        if not walkable(x + dx, y + dy):
+            return False
+        return corner_cutting or (walkable(x + dx, y) and walkable(x, y + dy))
+
+    def jump(x, y, dx, dy):
+        if not (dx and dy):
+            return jump_straight(x, y, dx, dy)
+
+        while can_step_diagonally(x, y, dx, dy):
+            x += dx
+            y += dy
+            if x == end_x and y == end_y:
+                return x, y
+            if corner_cutting and ((walkable(x - dx, y + dy) and not walkable(x - dx, y)) or
+                                   (walkable(x + dx, y - dy) and not walkable(x, y - dy))):
+                return x, y
+            if jump_straight(x, y, dx, 0) or jump_straight(x, y, 0, dy):
+                return x, y
+        return None
+
+    def directions(x, y, parent):
+        if parent < 0:
+            return [(dx, dy) for dx in (-1, 0, 1) for dy in (-1, 0, 1) if dx or dy]
+
+        px, py = divmod(parent, cols)
+        dx, dy = _sign(x - px), _sign(y - py)
+        if dx and dy:
+            result = [(dx, 0), (0, dy), (dx, dy)]
+            if corner_cutting:
+                if not walkable(x - dx, y):
+                    result.append((-dx, dy))
+                if not walkable(x, y - dy):
+                    result.append((dx, -dy))
+            return result
+
+        result = [(dx, dy)]
+        for perp_x, perp_y in ((dy, dx), (-dy, -dx)):
+            if corner_cutting:
+                if not walkable(x + perp_x, y + perp_y):
+                    result.append((dx + perp_x, dy + perp_y))
+            elif walkable(x + perp_x, y + perp_y) and not walkable(x - dx + perp_x, y - dy + perp_y):
+                result.append((perp_x, perp_y))
+                result.append((dx + perp_x, dy + perp_y))
+        return result
+
+    generation = astar.begin_search()
+    g_costs, parents = astar.g_costs, astar.parents
+    stamps, closed = astar.search_stamps, astar.closed_stamps
+    expanded = 0
+
+    stamps[start_index] = generation
+    g_costs[start_index] = 0.0
+    parents[start_index] = -1
+    astar.open_set = open_set = [(0.0, 0.0, 0.0, start_index)]
+
+    while open_set:
+        _, _, g_cost, index = heapq.heappop(open_set)
+        if closed[index] == generation or g_cost != g_costs[index]:
+            continue
+
+        if index == end_index:
+            astar.expanded_count = expanded
+            astar.last_cost = g_cost
+            return _expand_jumps(astar.reconstruct_indices(index))
+
+        closed[index] = generation
+        expanded += 1
+        x, y = divmod(index, cols)
+
+        for dx, dy in directions(x, y, parents[index]):
+            jump_point = jump(x, y, dx, dy)
+            if jump_point is None:
+                continue
+
+            jx, jy = jump_point
+            neighbor = jx * cols + jy
+            if closed[neighbor] == generation:
+                continue
+
+            tentative_g_cost = g_cost + octile_distance(x, y, jx, jy)
+            if stamps[neighbor] != generation:
+                stamps[neighbor] = generation
+            elif tentative_g_cost >= g_costs[neighbor]:
+                continue
+
+            parents[neighbor] = index
+            g_costs[neighbor] = tentative_g_cost
+            h_cost = octile_distance(jx, jy, end_x, end_y)
+            heapq.heappush(open_set, (tentative_g_cost + h_cost, h_cost, tentative_g_cost, neighbor))
+
+    astar.expanded_count = expanded
+    astar.last_cost = INF
+    return None
+
+
+def _expand_jumps(jump_points):
+    # Consecutive jump points always lie on one straight or diagonal line
+    path = jump_points[:1]
+    for (x1, y1), (x2, y2) in zip(jump_points, jump_points[1:]):
+        dx, dy = _sign(x2 - x1), _sign(y2 - y1)
+        x, y = x1, y1
+        while (x, y) != (x2, y2):
+            x += dx
+            y += dy
+            path.append((x, y))
+    return path
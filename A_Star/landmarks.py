@@ -0,0 +1,97 @@
+# ALT heuristics (A*, landmarks, triangle inequality) for many queries on one map.
+#
+# A few landmark cells each get a table of route costs to every cell, from one full Dijkstra
+# sweep apiece. Routes cost the same both ways, so for any landmark L the triangle inequality
+# gives |d(L, t) - d(L, n)| <= d(n, t): a lower bound on the real route cost that sees walls,
+# where the octile distance only sees the straight line. The heuristic is the largest of
+# these bounds and the octile one, so it stays admissible and consistent and A* still returns
+# optimal routes, usually after expanding far fewer cells.
+#
+# Landmarks are picked farthest-first: each new one is the reachable cell farthest (by route
+# cost) from those already chosen, which spreads them out to the far corners and dead ends of
+# the map where their bounds are tightest. A query only uses the few landmarks with the best
+# bound at its start. The tables describe one obstacle layout and terrain: a map listener
+# marks them stale on any edit, and they are rebuilt the next time a query needs them.
+#
+# Reference: Goldberg & Harrelson, "Computing the Shortest Path: A* Search Meets Graph
+# Theory" (SODA 2005).
+
+from array import array
+
+from cost_model import INF
+from distance_field import distance_array
+
+# Landmarks consulted per query; more only slows down every heuristic evaluation
+ACTIVE_LANDMARKS = 4
+
+
+class LandmarkTable:
+    def __init__(self, astar, count):
+        self.astar = astar
+        self.count = count
+        self.landmarks = []  # Cell indices
+        self.tables = []  # array("d") of route costs from each landmark to every cell
+        self.stale = True
+        self.built_for = None
+        astar.map_listeners.append(self.mark_stale)
+
+    def close(self):
+        if self.mark_stale in self.astar.map_listeners:
+            self.astar.map_listeners.remove(self.mark_stale)
+
+    def mark_stale(self, cells):
+        self.stale = True
+
+    def ensure_built(self):
+        if self.stale or self.built_for != self.astar.allow_corner_cutting:
+            self.build()
+
+    def build(self):
+        astar = self.astar
+        obstacles = astar.obstacles
+        self.landmarks, self.tables = [], []
+        self.stale = False
+        self.built_for = astar.allow_corner_cutting
+
+        # The first landmark is the cell farthest from the start (or the first free cell)
+        seed = astar.start.index
+        if obstacles[seed]:
+            seed = next((index for index in range(len(obstacles)) if not obstacles[index]), None)
+            if seed is None:
+                return
+        nearest = distance_array(astar, seed)
+
+        for _ in range(self.count):
+            # Reachable cell farthest from every landmark so far
+            farthest, landmark = 0.0, -1
+            for index, cost in enumerate(nearest):
+                if farthest < cost < INF:
+                    farthest, landmark = cost, index
+            if landmark < 0:
+                break  # Every reachable cell is already a landmark
+            table = distance_array(astar, landmark)
+            nearest = table if not self.tables else array("d", map(min, nearest, table))
+            self.landmarks.append(landmark)
+            self.tables.append(table)
+
+    def bounds_for(self, start_index, end_index, active=ACTIVE_LANDMARKS):
+        # (table, cost from the landmark to end) for the landmarks with the best bound at the
+        # start; landmarks that can't reach both cells say nothing about this query
+        self.ensure_built()
+        candidates = []
+        for table in self.tables:
+            to_start, to_end = table[start_index], table[end_index]
+            if to_start < INF and to_end < INF:
+                candidates.append((abs(to_end - to_start), len(candidates), table, to_end))
+        candidates.sort(reverse=True)
+        return [(table, to_end) for _, _, table, to_end in candidates[:active]]
+
+
+def landmark_search(astar, start_index, end_index, leg=None):
+    # AStarPathfinding.search guided by the ALT bounds of the best landmarks for this query
+    landmarks = astar.landmarks
+    if landmarks is None or landmarks.count != astar.landmark_count:
+        if landmarks is not None:
+            landmarks.close()
+        landmarks = astar.landmarks = LandmarkTable(astar, astar.landmark_count)
+    return astar.search(start_index, end_index, bounds=landmarks.bounds_for(start_index, end_index), leg=leg)
@@ -0,0 +1,31 @@
+# Deferred imports for modules that are slow to load and only needed on some code paths,
+# such as tkinter for the GUIs or plotting libraries. The real import happens on the first
+# attribute access, so importing a module that merely mentions them stays cheap.
+
+import importlib
+
+
+class LazyModule:
+    def __init__(self, name):
+        self.__dict__["_name"] = name
+        self.__dict__["_module"] = None
+
+    def _load(self):
+        module = self.__dict__["_module"]
+        if module is None:
+            module = self.__dict__["_module"] = importlib.import_module(self._name)
+        return module
+
+    def __getattr__(self, attribute):
+        return getattr(self._load(), attribute)
+
+    def __setattr__(self, attribute, value):
+        setattr(self._load(), attribute, value)
+
+    def __repr__(self):
+        state = "loaded" if self.__dict__["_module"] is not None else "not loaded"
+        return f"<lazy module {self._name!r} ({state})>"
+
+
+def lazy_import(name):
+    return LazyModule(name)
@@ -0,0 +1,179 @@
+# Reading maps and planning scenarios from files, for headless use of the planner.
+#
+# Text maps have one line per grid row (x), one character per column (y):
+#     .  free sand    #  obstacle    T  trash    S  robot start    E  end cell
+#     ~  wet sand     :  soft sand
+# S and E are optional and default to the top-left and bottom-right corners, as in the GUI.
+# Trash is listed in reading order, which is the "placement order" the planner starts from.
+# Wet and soft sand cost more to cross (see TERRAIN_COSTS); every other cell is dry sand.
+#
+# JSON files hold one scenario object or a list of them. A scenario either embeds a text map
+#     {"name": "cove", "map": ["..#..", ".T#..", "....E"]}
+# or lists cells explicitly
+#     {"name": "cove", "rows": 3, "cols": 5, "obstacles": [[0, 2], [1, 2]],
+#      "trash": [[1, 1]], "start": [0, 0], "end": [2, 4]}
+# Either form may add "terrain": one list of cell costs per row, which overrides the sand
+# symbols of an embedded map. Cells outside the map are an error, not wrapped onto the grid.
+#
+# Terrain files for load_terrain_file are the same rows of costs, either as JSON or as text
+# with one line per row and the costs separated by spaces or commas.
+#
+# save_graph writes a pathfinder's compiled neighbor graph as JSON for tools outside the
+# planner (networkx, scipy.sparse.csr_matrix((costs, targets, offsets)), ...):
+#     {"rows": 3, "cols": 5, "allow_corner_cutting": true,
+#      "offsets": [0, 3, ...], "targets": [1, 5, 6, ...], "costs": [1.0, 1.0, 1.414..., ...]}
+# Cell x, y is node x * cols + y, and its moves are targets[offsets[i]:offsets[i + 1]].
+
+import json
+import os
+
+from cost_model import INF, TERRAIN_COSTS
+from pathfinding import AStarPathfinding
+
+MAP_SYMBOLS = {".": "free", "#": "obstacle", "T": "trash", "S": "start", "E": "end",
+               "~": "wet sand", ":": "soft sand"}
+
+
+def parse_text_map(lines, name="map"):
+    rows = [line.rstrip("\r\n") for line in lines if line.strip()]
+    if not rows:
+        raise ValueError(f"{name}: map is empty")
+    if any(len(row) != len(rows[0]) for row in rows):
+        raise ValueError(f"{name}: map rows have different lengths")
+
+    scenario = {"name": name, "rows": len(rows), "cols": len(rows[0]), "obstacles": [], "trash": []}
+    terrain = [[TERRAIN_COSTS["dry sand"]] * len(rows[0]) for _ in rows]
+    for x, row in enumerate(rows):
+        for y, symbol in enumerate(row):
+            kind = MAP_SYMBOLS.get(symbol)
+            if kind is None:
+                raise ValueError(f"{name}: unknown map symbol {symbol!r} at row {x}, column {y}")
+            if kind == "obstacle":
+                scenario["obstacles"].append([x, y])
+            elif kind == "trash":
+                scenario["trash"].append([x, y])
+            elif kind in ("start", "end"):
+                scenario[kind] = [x, y]
+            elif kind in TERRAIN_COSTS:
+                terrain[x][y] = TERRAIN_COSTS[kind]
+    if any(cost != TERRAIN_COSTS["dry sand"] for row in terrain for cost in row):
+        scenario["terrain"] = terrain
+    return scenario
+
+
+def check_terrain(terrain, rows, cols, name):
+    # Rows of costs as floats, or ValueError naming the file
+    if len(terrain) != rows or any(len(row) != cols for row in terrain):
+        raise ValueError(f"{name}: terrain must be {rows} rows of {cols} costs")
+    try:
+        terrain = [[float(cost) for cost in row] for row in terrain]
+    except (TypeError, ValueError):
+        raise ValueError(f"{name}: terrain costs must be numbers") from None
+    if not all(0 < cost < INF for row in terrain for cost in row):
+        raise ValueError(f"{name}: terrain costs must be positive and finite")
+    return terrain
+
+
+def check_cell(cell, rows, cols, what, name):
+    # Cell as an (x, y) tuple inside the map, or ValueError naming the file
+    if (not isinstance(cell, (list, tuple)) or len(cell) != 2 or
+            not all(isinstance(value, int) and not isinstance(value, bool) for value in cell)):
+        raise ValueError(f"{name}: {what} {cell!r} is not an [x, y] cell")
+    x, y = cell
+    if not (0 <= x < rows and 0 <= y < cols):
+        raise ValueError(f"{name}: {what} [{x}, {y}] is outside the {rows}x{cols} map")
+    return x, y
+
+
+def check_cells(scenario):
+    rows, cols, name = scenario["rows"], scenario["cols"], scenario["name"]
+    for key, what in (("obstacles", "obstacle"), ("trash", "trash cell")):
+        if not isinstance(scenario[key], list):
+            raise ValueError(f"{name}: '{key}' must be a list of [x, y] cells")
+        scenario[key] = [list(check_cell(cell, rows, cols, what, name)) for cell in scenario[key]]
+    for key in ("start", "end"):
+        if key in scenario:
+            scenario[key] = list(check_cell(scenario[key], rows, cols, f"{key} cell", name))
+    return scenario
+
+
+def normalize_scenario(data, name):
+    if not isinstance(data, dict):
+        raise ValueError(f"{name}: scenario must be a JSON object, not {type(data).__name__}")
+    if "map" in data:
+        if not isinstance(data["map"], list) or not all(isinstance(row, str) for row in data["map"]):
+            raise ValueError(f"{name}: 'map' must be a list of row strings")
+        scenario = parse_text_map(data["map"], data.get("name", name))
+        scenario["trash"] = data.get("trash", scenario["trash"])
+        for key in ("start", "end"):
+            if key in data:
+                scenario[key] = data[key]
+        if "terrain" in data:
+            scenario["terrain"] = check_terrain(data["terrain"], scenario["rows"], scenario["cols"], scenario["name"])
+        return check_cells(scenario)
+
+    missing = [key for key in ("rows", "cols") if key not in data]
+    if missing:
+        raise ValueError(f"{name}: scenario needs {', '.join(missing)} or a 'map'")
+    rows, cols = data["rows"], data["cols"]
+    if not all(isinstance(size, int) and not isinstance(size, bool) and size > 0 for size in (rows, cols)):
+        raise ValueError(f"{name}: rows and cols must be positive whole numbers")
+    scenario = {"name": data.get("name", name), "rows": rows, "cols": cols,
+                "obstacles": data.get("obstacles", []), "trash": data.get("trash", [])}
+    for key in ("start", "end"):
+        if key in data:
+            scenario[key] = data[key]
+    if "terrain" in data:
+        scenario["terrain"] = check_terrain(data["terrain"], rows, cols, scenario["name"])
+    return check_cells(scenario)
+
+
+def load_scenarios(path):
+    name = os.path.splitext(os.path.basename(path))[0]
+    with open(path, encoding="utf-8") as file:
+        if not path.endswith(".json"):
+            return [parse_text_map(file, name)]
+        data = json.load(file)
+
+    if isinstance(data, list):
+        return [normalize_scenario(item, f"{name}[{i}]") for i, item in enumerate(data)]
+    return [normalize_scenario(data, name)]
+
+
+def load_terrain_file(path, rows, cols):
+    # Returns the file's costs as one list per row
+    name = os.path.basename(path)
+    with open(path, encoding="utf-8") as file:
+        if path.endswith(".json"):
+            terrain = json.load(file)
+        else:
+            terrain = [line.replace(",", " ").split() for line in file if line.strip()]
+    return check_terrain(terrain, rows, cols, name)
+
+
+def save_graph(astar, path):
+    offsets, targets, costs = astar.compiled_graph().export()
+    graph = {"rows": astar.rows, "cols": astar.cols, "allow_corner_cutting": astar.allow_corner_cutting,
+             "offsets": offsets.tolist(), "targets": targets.tolist(), "costs": costs.tolist()}
+    with open(path, "w", encoding="utf-8") as file:
+        json.dump(graph, file)
+
+
+def build_pathfinder(scenario):
+    astar = AStarPathfinding(scenario["rows"], scenario["cols"])
+    if "start" in scenario:
+        astar.start = astar.grid[scenario["start"][0]][scenario["start"][1]]
+    if "end" in scenario:
+        astar.end = astar.grid[scenario["end"][0]][scenario["end"][1]]
+
+    for x, y in scenario["obstacles"]:
+        astar.obstacles[x * astar.cols + y] = 1
+    astar.cells_changed([tuple(cell) for cell in scenario["obstacles"]])
+    if "terrain" in scenario:
+        astar.load_terrain([cost for row in scenario["terrain"] for cost in row])
+
+    for x, y in scenario["trash"]:
+        cell = astar.grid[x][y]
+        cell.is_trash = True
+        astar.trash_positions.append(cell)
+    return astar
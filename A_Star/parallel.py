@@ -0,0 +1,171 @@
+# Multi-process leg solving and distance rows for run_algorithm.
+#
+# Once the visiting order is fixed the legs are independent, and so are the Dijkstra rows of
+# the distance matrix, so both can be farmed out to a process pool. The obstacle grid lives
+# in a multiprocessing.shared_memory block that every worker maps as its own obstacle array:
+# tasks only carry a few indices and the grid version, and the parent copies the grid into
+# the block once per layout change rather than pickling it with each task. Workers run the
+# same search code on the same grid, so the stitched route is identical to the serial one.
+# Terrain costs share the block: rows * cols doubles first, then the obstacle bytes.
+#
+# Each worker keeps a pathfinder of its own for the g/parent arrays and per-map data such as
+# the compiled neighbor graph, JPS jump tables or landmark tables; that data is dropped
+# whenever the grid version it was built for is stale.
+
+import time
+import weakref
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+
+from distance_field import distance_field
+from pathfinding import AStarPathfinding
+
+_worker_astar = None
+_worker_memory = None
+
+
+def _attach(name):
+    try:
+        return shared_memory.SharedMemory(name=name, track=False)
+    except TypeError:
+        # Before Python 3.13 attaching always registers the block with the resource tracker;
+        # pool workers share the parent's tracker, so that registration is a no-op
+        return shared_memory.SharedMemory(name=name)
+
+
+def _start_worker(name, rows, cols):
+    global _worker_astar, _worker_memory
+    _worker_memory = _attach(name)
+    astar = AStarPathfinding(rows, cols)
+    size = rows * cols
+    astar.terrain = _worker_memory.buf[:8 * size].cast("d")
+    astar.obstacles = _worker_memory.buf[8 * size:9 * size]
+    astar.path_cache = None  # The parent caches legs; a worker only ever sees some of them
+    astar.grid_version = -1
+    _worker_astar = astar
+
+
+def _prepare(settings):
+    (version, min_terrain, weighted, engine, corner_cutting, cluster_size, bidirectional_threshold,
+     landmark_count) = settings
+    astar = _worker_astar
+    if astar.grid_version != version:
+        astar.grid_version = version
+        astar.map_listeners.clear()
+        astar.adjacency = None
+        astar.hierarchy = None
+        astar.landmarks = None
+        astar.min_terrain = min_terrain
+        astar.weighted = weighted
+    astar.engine = engine
+    astar.allow_corner_cutting = corner_cutting
+    astar.cluster_size = cluster_size
+    astar.bidirectional_threshold = bidirectional_threshold
+    astar.landmark_count = landmark_count
+    return astar
+
+
+def _leg_task(task):
+    settings, start_index, end_index = task
+    astar = _prepare(settings)
+    start_time = time.perf_counter()
+    path = astar.solve_path(astar.cell_at(start_index), astar.cell_at(end_index))
+    return path, astar.last_cost, astar.expanded_count, time.perf_counter() - start_time
+
+
+def _distance_task(task):
+    settings, source_index, targets = task
+    astar = _prepare(settings)
+    return distance_field(astar, source_index, targets), astar.expanded_count
+
+
+def _shutdown(executor, memory, views):
+    executor.shutdown(wait=True)
+    for view in views:
+        view.release()
+    memory.close()
+    memory.unlink()
+
+
+class ParallelPlanner:
+    # Process pool bound to one pathfinder. Created by AStarPathfinding.parallel_planner when
+    # astar.workers > 1; close() (or garbage collection) stops the workers and frees the block.
+
+    def __init__(self, astar, workers):
+        self.astar = astar
+        self.workers = workers
+        size = astar.rows * astar.cols
+        self.memory = shared_memory.SharedMemory(create=True, size=max(9 * size, 1))
+        self.terrain = self.memory.buf[:8 * size].cast("d")
+        self.obstacles = self.memory.buf[8 * size:9 * size]
+        self.version = None
+        self.executor = ProcessPoolExecutor(max_workers=workers, initializer=_start_worker,
+                                            initargs=(self.memory.name, astar.rows, astar.cols))
+        self._finalizer = weakref.finalize(self, _shutdown, self.executor, self.memory,
+                                           [self.terrain, self.obstacles])
+
+    def close(self):
+        self._finalizer()
+
+    def sync(self):
+        # Publish the current grid to the workers if it changed, and return the settings
+        # every task carries
+        astar = self.astar
+        if self.version != astar.grid_version:
+            self.terrain[:] = astar.terrain
+            self.obstacles[:] = astar.obstacles
+            self.version = astar.grid_version
+        return (self.version, astar.min_terrain, astar.weighted, astar.engine, astar.allow_corner_cutting,
+                astar.cluster_size, astar.bidirectional_threshold, astar.landmark_count)
+
+    def distance_fields(self, indices):
+        # One Dijkstra row per source, each only towards the cells after it. Returns
+        # [(found, expanded)] in source order; the last source needs no search
+        settings = self.sync()
+        tasks = [(settings, indices[i], indices[i + 1:]) for i in range(len(indices) - 1)]
+        return list(self.executor.map(_distance_task, tasks)) + [({}, 0)]
+
+    def solve_legs(self, destinations):
+        # Paths between consecutive destinations, in order, each yielded as soon as it is
+        # solved while the workers carry on with the legs after it
+        return self.iter_pairs(list(zip(destinations, destinations[1:])))
+
+    def solve_pairs(self, pairs):
+        # Paths for (start, end) cell pairs, in order, with cached legs served locally
+        return list(self.iter_pairs(pairs))
+
+    def iter_pairs(self, pairs):
+        astar = self.astar
+        cache = astar.path_cache
+        cached = [cache.lookup(start.index, end.index) if cache is not None else None for start, end in pairs]
+
+        # Every uncached leg is submitted up front; map hands the results back in order
+        settings = self.sync()
+        tasks = [(settings, start.index, end.index) for (start, end), hit in zip(pairs, cached) if hit is None]
+        solved = self.executor.map(_leg_task, tasks)
+
+        for (start, end), hit in zip(pairs, cached):
+            if hit is None:
+                result = next(solved)
+                path, cost = result[0], result[1]
+                # A leg solved on the grid as it was before an edit made meanwhile isn't cached
+                if cache is not None and astar.grid_version == self.version:
+                    cache.store(start.index, end.index, None if path is None else list(path), cost)
+            else:
+                result = (None if hit.path is None else list(hit.path), hit.cost, 0, 0.0)
+            if astar.search_observers:
+                self.report(start, end, result, hit is not None)
+            yield result[0]
+
+    def report(self, start, end, result, cached):
+        from search_stats import LegStats
+
+        path, cost, expanded, seconds = result
+        leg = LegStats((start.x, start.y), (end.x, end.y), self.astar.engine)
+        leg.cached = cached
+        leg.found = path is not None
+        leg.cost = cost
+        leg.expanded = expanded
+        leg.seconds = seconds
+        for observer in list(self.astar.search_observers):
+            observer.leg_finished(leg)
@@ -0,0 +1,132 @@
+# Bounded LRU cache of solved legs with region-based invalidation.
+#
+# Pressing "Run" again after a small edit usually leaves most legs untouched, so run_path
+# keeps recent results keyed by (start, end, engine, corner rule). Every obstacle edit is
+# checked against each cached leg and only legs the edit can affect are dropped:
+#
+# - A newly blocked cell breaks a leg only if the route runs through it (or, without corner
+#   cutting, squeezes diagonally past it). Blocking never makes a route shorter, so other
+#   legs stay optimal, and legs cached as unreachable stay unreachable.
+# - A newly freed cell can only shorten a leg if a route through it could beat the cached
+#   cost, i.e. if it lies inside the octile "ellipse" octile(s, c) + octile(c, t) < cost
+#   (plus a little slack for diagonals it unblocks). Freeing a cell can also connect an
+#   unreachable leg, so those are dropped on any freeing edit.
+# - A terrain edit on a free cell is checked like freeing it: a route through the cell costs
+#   at least min_terrain times the octile ellipse, whether the edit made the cell dearer
+#   (only routes through it get longer) or cheaper (only routes through it can get shorter).
+
+from collections import OrderedDict
+
+from cost_model import DIAGONAL_COST, STRAIGHT_COST, octile_distance
+
+# A freed cell next to a route can unblock a diagonal that never enters the cell itself
+DIAGONAL_SLACK = 2 * STRAIGHT_COST - DIAGONAL_COST
+
+# Edits touching more cells than this (e.g. loading a whole terrain map) just empty the
+# cache; checking them against every leg would cost more than solving the legs again
+MAX_CHECKED_CELLS = 4096
+
+
+class CachedLeg:
+    __slots__ = ("path", "cost", "cells", "bounds")
+
+    def __init__(self, path, cost, cols):
+        self.path = path
+        self.cost = cost
+        self.cells = None if path is None else {x * cols + y for x, y in path}
+        if path is None:
+            self.bounds = None
+        else:
+            xs = [x for x, _ in path]
+            ys = [y for _, y in path]
+            self.bounds = (min(xs), max(xs), min(ys), max(ys))
+
+
+class PathCache:
+    def __init__(self, astar, max_entries=256):
+        self.astar = astar
+        self.max_entries = max_entries
+        self.entries = OrderedDict()
+        self.version = astar.grid_version
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+        astar.map_listeners.append(self.cells_changed)
+
+    def key(self, start_index, end_index):
+        return start_index, end_index, self.astar.engine, self.astar.allow_corner_cutting
+
+    def lookup(self, start_index, end_index):
+        # Returns the cached CachedLeg, or None on a miss
+        if self.version != self.astar.grid_version:
+            # The map changed without telling us which cells, so nothing can be trusted
+            self.clear()
+        entry = self.entries.get(self.key(start_index, end_index))
+        if entry is None:
+            self.misses += 1
+            return None
+        self.entries.move_to_end(self.key(start_index, end_index))
+        self.hits += 1
+        return entry
+
+    def store(self, start_index, end_index, path, cost):
+        self.entries[self.key(start_index, end_index)] = CachedLeg(path, cost, self.astar.cols)
+        self.entries.move_to_end(self.key(start_index, end_index))
+        while len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+            self.evictions += 1
+
+    def clear(self):
+        self.invalidations += len(self.entries)
+        self.entries.clear()
+        self.version = self.astar.grid_version
+
+    def cells_changed(self, cells):
+        astar = self.astar
+        cols = astar.cols
+        h_scale = astar.min_terrain
+        stale = []
+        if len(cells) > MAX_CHECKED_CELLS:
+            self.clear()
+            return
+
+        for key, entry in self.entries.items():
+            start_x, start_y = divmod(key[0], cols)
+            end_x, end_y = divmod(key[1], cols)
+            corner_cutting = key[3]
+            bound = entry.cost / h_scale + DIAGONAL_SLACK
+            for x, y in cells:
+                if astar.obstacles[x * cols + y]:
+                    if entry.path is not None and self.blocks(entry, x, y, cols, corner_cutting):
+                        stale.append(key)
+                        break
+                elif entry.path is None or (
+                        octile_distance(start_x, start_y, x, y) + octile_distance(x, y, end_x, end_y) < bound):
+                    stale.append(key)
+                    break
+
+        for key in stale:
+            del self.entries[key]
+        self.invalidations += len(stale)
+        self.version = astar.grid_version
+
+    @staticmethod
+    def blocks(entry, x, y, cols, corner_cutting):
+        min_x, max_x, min_y, max_y = entry.bounds
+        if not (min_x - 1 <= x <= max_x + 1 and min_y - 1 <= y <= max_y + 1):
+            return False
+        if x * cols + y in entry.cells:
+            return True
+        if corner_cutting:
+            return False
+        # Without corner cutting, a blocked cell also forbids diagonals squeezing past it
+        path = entry.path
+        for (x1, y1), (x2, y2) in zip(path, path[1:]):
+            if x1 != x2 and y1 != y2 and ((x, y) == (x1, y2) or (x, y) == (x2, y1)):
+                return True
+        return False
+
+    def stats(self):
+        return {"entries": len(self.entries), "hits": self.hits, "misses": self.misses,
+                "evictions": self.evictions, "invalidations": self.invalidations}
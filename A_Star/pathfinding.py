@@ -0,0 +1,592 @@
+# Planning engine behind the TrashTrek GUI: grid model, cost model and route planning.
+# Nothing in here depends on tkinter, so it can be imported by batch jobs and servers.
+# The optional engines (bidirectional, JPS, HPA*, ALT, D* Lite) are imported the first time they
+# are selected, so importing the planner only loads what the default A* route needs.
+
+import heapq
+import math
+from array import array
+
+from adjacency import UNBUILT, Adjacency
+from cost_model import (DIAGONAL_COST, HALF_DIAGONAL_COST, HALF_STRAIGHT_COST, INF, MAX_GENERATION,
+                        ROUNDING_SLACK, STRAIGHT_COST, octile_distance)
+from distance_field import DistanceMatrix
+from path_cache import PathCache
+from tour import optimize_tour, tour_length
+
+
+class Cell:
+    # Thin view onto one cell of an AStarPathfinding grid. The state itself lives in the
+    # pathfinder's flat arrays, so views are created on demand and cost nothing to keep around.
+    __slots__ = ("astar", "x", "y", "index")
+
+    def __init__(self, astar, x, y):
+        self.astar = astar
+        self.x = x
+        self.y = y
+        self.index = x * astar.cols + y
+
+    @property
+    def is_obstacle(self):
+        return bool(self.astar.obstacles[self.index])
+
+    @is_obstacle.setter
+    def is_obstacle(self, value):
+        if value:
+            self.astar.set_obstacle(self.x, self.y)
+        else:
+            self.astar.clear_obstacle(self.x, self.y)
+
+    @property
+    def is_trash(self):
+        return bool(self.astar.trash[self.index])
+
+    @is_trash.setter
+    def is_trash(self, value):
+        self.astar.trash[self.index] = 1 if value else 0
+
+    @property
+    def g_cost(self):
+        if self.astar.search_stamps[self.index] != self.astar.generation:
+            return INF
+        return self.astar.g_costs[self.index]
+
+    @property
+    def parent(self):
+        if self.astar.search_stamps[self.index] != self.astar.generation:
+            return None
+        parent = self.astar.parents[self.index]
+        return None if parent < 0 else self.astar.cell_at(parent)
+
+    def __eq__(self, other):
+        return isinstance(other, Cell) and self.index == other.index and self.astar is other.astar
+
+    def __hash__(self):
+        return self.index
+
+    def __repr__(self):
+        return f"Cell({self.x}, {self.y})"
+
+
+class GridView:
+    # Keeps the old grid[x][y] indexing working on top of the flat arrays
+    __slots__ = ("astar",)
+
+    def __init__(self, astar):
+        self.astar = astar
+
+    def __len__(self):
+        return self.astar.rows
+
+    def __getitem__(self, x):
+        if x < 0:
+            x += self.astar.rows
+        if not 0 <= x < self.astar.rows:
+            raise IndexError("grid row index out of range")
+        return GridRow(self.astar, x)
+
+    def __iter__(self):
+        for x in range(self.astar.rows):
+            yield GridRow(self.astar, x)
+
+
+class GridRow:
+    __slots__ = ("astar", "x")
+
+    def __init__(self, astar, x):
+        self.astar = astar
+        self.x = x
+
+    def __len__(self):
+        return self.astar.cols
+
+    def __getitem__(self, y):
+        if y < 0:
+            y += self.astar.cols
+        if not 0 <= y < self.astar.cols:
+            raise IndexError("grid column index out of range")
+        return Cell(self.astar, self.x, y)
+
+    def __iter__(self):
+        for y in range(self.astar.cols):
+            yield Cell(self.astar, self.x, y)
+
+
+class AStarPathfinding:
+    def __init__(self, rows, cols):
+        self.rows = rows
+        self.cols = cols
+        size = rows * cols
+
+        # Flat, contiguous per-cell storage indexed by x * cols + y
+        self.obstacles = bytearray(size)
+        # Bumped on every obstacle edit so derived data (e.g. jump tables) knows when it is stale,
+        # and structures that can update incrementally register a listener for the edited cells
+        self.grid_version = 0
+        self.map_listeners = []
+        self.trash = bytearray(size)
+        # Traversal cost of every cell (1.0 = dry sand, more for wet or soft sand). A move costs
+        # its length times the mean cost of the two cells, so every route costs the same both
+        # ways, and heuristics are scaled by min_terrain so they never overestimate. weighted
+        # is False while every cell costs 1.0, which keeps the plain-grid fast paths
+        self.terrain = array("d", [1.0]) * size
+        self.min_terrain = 1.0
+        self.weighted = False
+        # The legal moves out of each cell, worked out as searches reach it (see adjacency.py)
+        self.adjacency = None
+        self.g_costs = array("d", [INF]) * size
+        self.parents = array("i", [-1]) * size
+
+        # Search state is only valid where a cell's stamp equals the current generation, so
+        # starting a new search is a counter bump instead of a sweep over the whole grid
+        self.generation = 0
+        self.search_stamps = array("I", [0]) * size
+        self.closed_stamps = array("I", [0]) * size
+
+        self.grid = GridView(self)
+        self.start = self.grid[0][0]
+        self.end = self.grid[rows - 1][cols - 1]
+        self.open_set = []
+        self.trash_positions = []
+
+        # Cutting past the corner of an obstacle on a diagonal move is allowed by default
+        self.allow_corner_cutting = True
+        # Search used by run_path: "astar", "jps" (Jump Point Search), "bidirectional" or
+        # "hierarchical" (HPA* over clusters of cluster_size x cluster_size cells)
+        self.engine = "astar"
+        self.cluster_size = 16
+        self.hierarchy = None
+
+        # Stops of the last planned route, and per stop the D* Lite replanner repairing the leg
+        # to it (None while the leg has only been repaired once, see repair_route)
+        self.route_stops = []
+        self.replanners = {}
+
+        # Opt-in instrumentation: search_stats.SearchObserver instances told about every leg
+        # and run. Nothing is counted or timed while the list is empty
+        self.search_observers = []
+
+        # Fleet planning (run_fleet): robot_count robots, starting from robot_starts if given and
+        # otherwise all from start, share the trash and each finish at end
+        self.robot_count = 1
+        self.robot_starts = []
+        self.fleet_stops = []
+        self.makespan = 0.0
+        self.fleet_distance = 0.0
+
+        # With more than one worker, legs and distance rows are solved in a process pool that
+        # shares the obstacle grid (see parallel.py); the pool is started on first use
+        self.workers = 1
+        self.parallel = None
+
+        # Recently solved legs; set to None to always search from scratch
+        self.path_cache = PathCache(self, max_entries=256)
+        # When set, the "astar" engine hands legs with at least this octile length to
+        # bidirectional A*
+        self.bidirectional_threshold = None
+        # When above 0, the "astar" engine is guided by ALT bounds from this many landmarks
+        # (see landmarks.py). Worth it for many queries on an unchanging map: the tables cost
+        # one Dijkstra sweep per landmark and are rebuilt on the first query after an edit
+        self.landmark_count = 0
+        self.landmarks = None
+        self.expanded_per_direction = (0, 0)
+        self.expanded_count = 0
+        self.last_cost = INF
+
+        # Smooth every leg into straight any-angle segments between the cells the robot has to
+        # turn at, instead of following the grid cell by cell (see any_angle.py)
+        self.any_angle = False
+
+        # Visit trash in the shortest order found instead of the order it was placed in
+        self.optimize_order = True
+        self.click_order_distance = 0.0
+        self.optimized_distance = 0.0
+
+    def cell_at(self, index):
+        x, y = divmod(index, self.cols)
+        return Cell(self, x, y)
+
+    def begin_search(self):
+        self.generation += 1
+        if self.generation > MAX_GENERATION:
+            # Stamps are about to wrap around, so pay for one full clear
+            size = self.rows * self.cols
+            self.search_stamps = array("I", [0]) * size
+            self.closed_stamps = array("I", [0]) * size
+            self.generation = 1
+        return self.generation
+
+    def set_obstacle(self, x, y):
+        self.obstacles[x * self.cols + y] = 1
+        self.cells_changed([(x, y)])
+
+    def clear_obstacle(self, x, y):
+        self.obstacles[x * self.cols + y] = 0
+        self.cells_changed([(x, y)])
+
+    def set_obstacles(self, cells, blocked=True):
+        # Bulk edit, e.g. one brush stroke: a single version bump and listener call for every
+        # cell that actually changed. Returns those cells
+        obstacles, cols = self.obstacles, self.cols
+        value = 1 if blocked else 0
+        changed = []
+        for x, y in cells:
+            index = x * cols + y
+            if obstacles[index] != value:
+                obstacles[index] = value
+                changed.append((x, y))
+        if changed:
+            self.cells_changed(changed)
+        return changed
+
+    def set_terrain(self, cells, cost):
+        # Bulk terrain edit, like set_obstacles. Returns the cells whose cost changed
+        if not 0 < cost < INF:
+            raise ValueError(f"terrain cost must be positive and finite, not {cost!r}")
+        terrain, cols = self.terrain, self.cols
+        changed = []
+        for x, y in cells:
+            index = x * cols + y
+            if terrain[index] != cost:
+                terrain[index] = cost
+                changed.append((x, y))
+        if changed:
+            self.terrain_changed(changed)
+        return changed
+
+    def load_terrain(self, costs):
+        # Replace the whole cost map with rows * cols costs in index order
+        costs = array("d", costs)
+        if len(costs) != self.rows * self.cols:
+            raise ValueError(f"terrain needs {self.rows * self.cols} costs, got {len(costs)}")
+        if not all(0 < cost < INF for cost in costs):
+            raise ValueError("terrain costs must be positive and finite")
+        old, cols = self.terrain, self.cols
+        changed = [divmod(index, cols) for index in range(len(costs)) if costs[index] != old[index]]
+        self.terrain = costs
+        if changed:
+            self.terrain_changed(changed)
+
+    def terrain_changed(self, cells):
+        # Terrain edits invalidate cached legs and derived data the same way obstacle edits do
+        self.min_terrain = min(self.terrain)
+        self.weighted = self.min_terrain != 1.0 or max(self.terrain) != 1.0
+        self.cells_changed(cells)
+
+    def cells_changed(self, cells):
+        # Called after the obstacle layout or the terrain changes; listeners get the list of (x, y) cells
+        self.grid_version += 1
+        for listener in self.map_listeners:
+            listener(cells)
+
+    def calculate_h_cost(self, cell, target):
+        return octile_distance(cell.x, cell.y, target.x, target.y) * self.min_terrain
+
+    def compiled_graph(self):
+        # The Adjacency (per-cell move masks) searches iterate, created on first use and kept in
+        # step with every obstacle edit
+        if self.adjacency is None:
+            self.adjacency = Adjacency(self)
+        self.adjacency.ensure_built()
+        return self.adjacency
+
+    def neighbor_steps(self, index):
+        # (neighbor index, step cost) pairs for every legal move out of a cell
+        return self.compiled_graph().steps(index)
+
+    def neighbor_indices(self, index):
+        return [neighbor for neighbor, _ in self.neighbor_steps(index)]
+
+    def get_neighbors(self, cell):
+        return [self.cell_at(index) for index in self.neighbor_indices(cell.index)]
+
+    def reconstruct_path(self, current):
+        return self.reconstruct_indices(current.index)
+
+    def reconstruct_indices(self, index):
+        path = []
+        cols, parents = self.cols, self.parents
+
+        while index >= 0:
+            path.append(divmod(index, cols))
+            index = parents[index]
+        return path[::-1]
+
+    def distance_matrix(self, cells, keep_paths=False):
+        # Shortest-path cost between every pair of cells from one Dijkstra wavefront per cell
+        return DistanceMatrix(self, cells, keep_paths=keep_paths, parallel=self.parallel_planner())
+
+    def parallel_planner(self):
+        if self.workers <= 1:
+            return None
+        if self.parallel is None or self.parallel.workers != self.workers:
+            from parallel import ParallelPlanner
+            self.close_workers()
+            self.parallel = ParallelPlanner(self, self.workers)
+        return self.parallel
+
+    def close_workers(self):
+        if self.parallel is not None:
+            self.parallel.close()
+            self.parallel = None
+
+    def plan_visit_order(self):
+        # Combine trash positions with end cell as the last destination
+        destinations = [self.start] + self.trash_positions + [self.end]
+        self.click_order_distance = self.optimized_distance = 0.0
+
+        if not self.optimize_order or len(self.trash_positions) < 2:
+            return destinations
+
+        dist = self.distance_matrix(destinations)
+        if INF in dist[0]:
+            return destinations  # Something is unreachable, run_algorithm will report it
+
+        order = optimize_tour(dist)
+        self.click_order_distance = tour_length(list(range(len(destinations))), dist)
+        self.optimized_distance = tour_length(order, dist)
+        return [destinations[i] for i in order]
+
+    def run_algorithm(self):
+        if self.search_observers:
+            from search_stats import observed_run_algorithm
+            return observed_run_algorithm(self, self.plan_route)
+        return self.plan_route()
+
+    def iter_legs(self):
+        # Streaming run_algorithm: fixes the visiting order, then yields the path of each leg
+        # as soon as it is solved, so a robot can set off before the later legs are planned.
+        # Consecutive legs share the stop between them. A leg that can't be solved is yielded
+        # as None and ends the route
+        if self.search_observers:
+            from search_stats import observed_legs
+            return observed_legs(self, self.plan_legs())
+        return self.plan_legs()
+
+    def run_fleet(self):
+        # One path per robot, splitting the trash to finish the beach soonest (see fleet.py)
+        from fleet import plan_fleet
+        if self.search_observers:
+            from search_stats import observed_run_algorithm
+            return observed_run_algorithm(self, lambda: plan_fleet(self))
+        return plan_fleet(self)
+
+    def plan_route(self):
+        path = []
+        for current_path in self.plan_legs():
+            if not current_path:
+                return None
+
+            path.extend(current_path[:-1])  # Exclude the last cell (end position) from the current path
+
+        end = self.route_stops[-1]
+        path.append((end.x, end.y))  # The last leg still has to arrive
+        return path
+
+    def plan_legs(self):
+        destinations = self.plan_visit_order()
+        self.route_stops = destinations[1:]
+        self.close_replanners()
+
+        planner = self.parallel_planner()
+        if planner is not None:
+            legs = planner.solve_legs(destinations)
+        else:
+            legs = (self.run_path(start, end) for start, end in zip(destinations, destinations[1:]))
+
+        smooth_path = None
+        if self.any_angle:
+            from any_angle import smooth_path
+        for leg in legs:
+            if not leg:
+                yield None
+                return
+            yield smooth_path(self, leg) if smooth_path else leg
+
+    def close_replanners(self):
+        for replanner in self.replanners.values():
+            if replanner is not None:
+                replanner.close()
+        self.replanners = {}
+
+    def repair_route(self, current, remaining):
+        # Called when a cell on the route ahead got blocked while the robot is moving.
+        # Replans from the robot's cell to the next stop on the route and keeps the rest of
+        # the route as it was. The first repair of a leg, usually its only one, is a fresh
+        # search: a D* Lite replanner's first search covers as much of the map and costs
+        # several times more. Repeat repairs of the same leg go through one D* Lite
+        # replanner per stop, so they are incremental instead of from scratch.
+        stops = {(cell.x, cell.y) for cell in self.route_stops}
+        stop = next((i for i, cell in enumerate(remaining) if cell in stops), len(remaining) - 1)
+        goal_x, goal_y = remaining[stop]
+        goal = goal_x * self.cols + goal_y
+        current_index = current[0] * self.cols + current[1]
+
+        replanner = self.replanners.get(goal)
+        if replanner is not None and replanner.h_scale > self.min_terrain:
+            # Cheaper terrain appeared, so its heuristic could now overestimate
+            replanner.close()
+            replanner = self.replanners[goal] = None
+        if goal not in self.replanners:
+            self.replanners[goal] = None
+            leg = self.run_path(self.cell_at(current_index), self.cell_at(goal))
+        else:
+            if replanner is None:
+                from dstar_lite import DStarLite
+                replanner = self.replanners[goal] = DStarLite(self, current_index, goal)
+            leg = replanner.replan(current_index)
+        if leg is None:
+            return None
+        if self.any_angle:
+            from any_angle import smooth_path
+            leg = smooth_path(self, leg)
+        return leg + remaining[stop + 1:]
+
+    def path_cost(self, path):
+        terrain, cols, weighted = self.terrain, self.cols, self.weighted
+        total = 0.0
+        for (x1, y1), (x2, y2) in zip(path, path[1:]):
+            if abs(x2 - x1) > 1 or abs(y2 - y1) > 1:
+                # Any-angle segment, straight across sand of one cost (see any_angle.py)
+                total += math.hypot(x2 - x1, y2 - y1) * terrain[x1 * cols + y1]
+                continue
+            step_cost = DIAGONAL_COST if x1 != x2 and y1 != y2 else STRAIGHT_COST
+            if weighted:
+                step_cost = (HALF_DIAGONAL_COST if x1 != x2 and y1 != y2 else HALF_STRAIGHT_COST) * (
+                    terrain[x1 * cols + y1] + terrain[x2 * cols + y2])
+            total += step_cost
+        return total
+
+    def run_path(self, start, end):
+        # Solve one leg, reusing a cached result when no edit since then could change it
+        if self.search_observers:
+            from search_stats import observed_run_path
+            return observed_run_path(self, start, end)
+        if self.path_cache is None:
+            return self.solve_path(start, end)
+
+        cached = self.path_cache.lookup(start.index, end.index)
+        if cached is not None:
+            self.expanded_count = 0
+            self.last_cost = cached.cost
+            return None if cached.path is None else list(cached.path)
+
+        path = self.solve_path(start, end)
+        self.path_cache.store(start.index, end.index, None if path is None else list(path), self.last_cost)
+        return path
+
+    def solve_path(self, start, end, leg=None):
+        # A* with a binary-heap open set (lazy deletion) and generation-stamped search state.
+        # Each pop/push is O(log V) and open/closed checks are O(1), so a search costs
+        # O(E log V); starting a search is a counter bump rather than a sweep over the grid.
+        # Moves cost 1 straight and sqrt(2) diagonally and the octile heuristic is consistent,
+        # so the first time the end cell is popped its path is optimal. A LegStats passed as
+        # leg gets the search counters of the legs solved by search() (see search_stats.py)
+        if self.engine == "astar":
+            if (self.bidirectional_threshold is not None and
+                    octile_distance(start.x, start.y, end.x, end.y) >= self.bidirectional_threshold):
+                from bidirectional import bidirectional_search
+                return bidirectional_search(self, start.index, end.index)
+            if self.landmark_count > 0:
+                from landmarks import landmark_search
+                return landmark_search(self, start.index, end.index, leg)
+            return self.search(start.index, end.index, leg=leg)
+        if self.engine == "bidirectional":
+            from bidirectional import bidirectional_search
+            return bidirectional_search(self, start.index, end.index)
+        if self.engine == "jps":
+            if self.weighted:
+                # Jump points assume every move of a kind costs the same, so weighted
+                # terrain is searched with plain A*
+                return self.search(start.index, end.index, leg=leg)
+            from jump_point import jump_point_search
+            return jump_point_search(self, start.index, end.index)
+        if self.engine == "hierarchical":
+            from hierarchical import hierarchical_search
+            return hierarchical_search(self, start.index, end.index)
+        raise ValueError(f"Unknown search engine: {self.engine!r}")
+
+    def run_dijkstra(self, start, end):
+        # Reference search with a zero heuristic, used to check run_path for optimality
+        return self.search(start.index, end.index, use_heuristic=False)
+
+    def search(self, start_index, end_index, use_heuristic=True, bounds=(), leg=None):
+        # The one A* loop behind the "astar" engine, Dijkstra (use_heuristic=False), ALT
+        # (bounds: (table, cost from the landmark to end) pairs, see landmarks.py) and the
+        # instrumented legs of search_stats (leg: a LegStats to fill in)
+        cols = self.cols
+        end_x, end_y = divmod(end_index, cols)
+        h_scale = self.min_terrain
+        generation = self.begin_search()
+        g_costs, parents = self.g_costs, self.parents
+        stamps, closed = self.search_stamps, self.closed_stamps
+        graph = self.compiled_graph()
+        masks, moves, fill, terrain = graph.masks, graph.moves, graph.fill, self.terrain
+        expanded, generated, reopened, peak_open = 0, 1, 0, 1
+
+        stamps[start_index] = generation
+        g_costs[start_index] = 0.0
+        parents[start_index] = -1
+        # Entries are (f, h, g, index); ties on f prefer the cell closer to the goal
+        self.open_set = open_set = [(0.0, 0.0, 0.0, start_index)]
+
+        path, cost = None, INF
+        while open_set:
+            _, _, g_cost, index = heapq.heappop(open_set)
+
+            # Skip entries left behind by a decrease-key or for cells already expanded
+            if closed[index] == generation or g_cost != g_costs[index]:
+                continue
+
+            if index == end_index:
+                path, cost = self.reconstruct_indices(index), g_cost
+                break
+
+            closed[index] = generation
+            expanded += 1
+
+            mask = masks[index]
+            if mask == UNBUILT:
+                mask = fill(index)
+            here = terrain[index]
+            for offset, half_length in moves[mask]:
+                neighbor = index + offset
+                if closed[neighbor] == generation:
+                    continue
+
+                tentative_g_cost = g_cost + half_length * (here + terrain[neighbor])
+                if stamps[neighbor] != generation:
+                    stamps[neighbor] = generation
+                    generated += 1
+                elif tentative_g_cost >= g_costs[neighbor]:
+                    continue
+                else:
+                    reopened += 1
+
+                parents[neighbor] = index
+                g_costs[neighbor] = tentative_g_cost
+                if use_heuristic:
+                    nx, ny = divmod(neighbor, cols)
+                    h_cost = octile_distance(nx, ny, end_x, end_y) * h_scale
+                    for table, to_end in bounds:
+                        bound = to_end - table[neighbor]
+                        if bound < 0.0:
+                            bound = -bound
+                        bound -= ROUNDING_SLACK
+                        if bound > h_cost:
+                            h_cost = bound
+                else:
+                    h_cost = 0.0
+                heapq.heappush(open_set, (tentative_g_cost + h_cost, h_cost, tentative_g_cost, neighbor))
+
+            # Cells waiting on the open set; stale heap entries left by a decrease-key don't count
+            if generated - expanded > peak_open:
+                peak_open = generated - expanded
+
+        self.expanded_count = expanded
+        self.last_cost = cost
+        if leg is not None:
+            leg.generated = generated
+            leg.reopened = reopened
+            leg.peak_open = peak_open
+        return path
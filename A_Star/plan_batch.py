@@ -0,0 +1,123 @@
+"""Plan TrashTrek routes headlessly for many scenarios and write JSON lines.
+
+Each input file is a text map or a JSON scenario file (see map_io.py). One JSON object per
+scenario is written, in input order, with the route, its length and travel cost, and timings.
+"distance" is the geometric length of the route in cells, as the GUI reports it. The "cost"
+fields are what the planner minimises: the same as the length on dry sand, and more wherever
+the route crosses wet or soft sand.
+
+Usage:
+    python A_Star/plan_batch.py maps/*.txt scenarios.json --output results.jsonl --workers 4
+"""
+
+import json
+import math
+import os
+import sys
+import time
+
+from map_io import build_pathfinder, load_scenarios, save_graph
+from search_stats import LegStats, SearchStats
+
+
+def leg_record(leg):
+    record = {field: getattr(leg, field) for field in LegStats.__slots__}
+    if not leg.found:
+        record["cost"] = None  # JSON has no infinity
+    return record
+
+
+def plan_scenario(scenario, options):
+    start_time = time.perf_counter()
+    astar = build_pathfinder(scenario)
+    astar.engine = options["engine"]
+    astar.allow_corner_cutting = options["allow_corner_cutting"]
+    astar.optimize_order = options["optimize_order"]
+    astar.any_angle = options["any_angle"]
+    if options["stats"]:
+        stats = SearchStats()
+        astar.search_observers.append(stats)
+    built = time.perf_counter()
+    if options["export_graph"]:
+        save_graph(astar, os.path.join(options["export_graph"], scenario["name"] + ".graph.json"))
+
+    path = astar.run_algorithm()
+    planned = time.perf_counter()
+
+    result = {
+        "scenario": scenario["name"],
+        "rows": astar.rows,
+        "cols": astar.cols,
+        "trash": len(astar.trash_positions),
+        "found": path is not None,
+        "distance": sum(math.dist(a, b) for a, b in zip(path, path[1:])) if path else None,
+        "cost": astar.path_cost(path) if path else None,
+        "placement_order_cost": astar.click_order_distance or None,
+        "optimized_order_cost": astar.optimized_distance or None,
+        "stops": [[cell.x, cell.y] for cell in astar.route_stops],
+        "build_seconds": round(built - start_time, 6),
+        "planning_seconds": round(planned - built, 6),
+    }
+    if options["stats"]:
+        result["legs"] = [leg_record(leg) for leg in stats.legs]
+    if options["include_paths"]:
+        result["path"] = [list(cell) for cell in path] if path else None
+    return result
+
+
+def plan_many(scenarios, options, workers=1):
+    if workers <= 1:
+        for scenario in scenarios:
+            yield plan_scenario(scenario, options)
+        return
+
+    # Imported here so worker processes, which import this module, don't pay for it
+    from concurrent.futures import ProcessPoolExecutor
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        yield from executor.map(plan_scenario, scenarios, [options] * len(scenarios))
+
+
+def main(argv=None):
+    import argparse
+
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("inputs", nargs="+", help="text map or JSON scenario files")
+    parser.add_argument("--output", "-o", help="JSON lines file to write (default: stdout)")
+    parser.add_argument("--workers", "-j", type=int, default=1, help="plan scenarios in this many processes")
+    parser.add_argument("--engine", default="astar", choices=("astar", "jps", "bidirectional", "hierarchical"))
+    parser.add_argument("--no-corner-cutting", action="store_true", help="forbid diagonals past obstacle corners")
+    parser.add_argument("--placement-order", action="store_true", help="visit trash in the order it is listed")
+    parser.add_argument("--any-angle", action="store_true", help="smooth routes into straight any-angle segments")
+    parser.add_argument("--stats", action="store_true", help="add per-leg search statistics to the output")
+    parser.add_argument("--no-paths", action="store_true", help="leave the cell-by-cell paths out of the output")
+    parser.add_argument("--export-graph", metavar="DIR",
+                        help="also write each scenario's neighbor graph to DIR/<name>.graph.json (see map_io.py)")
+    args = parser.parse_args(argv)
+
+    try:
+        scenarios = [scenario for path in args.inputs for scenario in load_scenarios(path)]
+    except (OSError, ValueError) as error:
+        parser.error(str(error))
+
+    options = {
+        "engine": args.engine,
+        "allow_corner_cutting": not args.no_corner_cutting,
+        "optimize_order": not args.placement_order,
+        "any_angle": args.any_angle,
+        "include_paths": not args.no_paths,
+        "stats": args.stats,
+        "export_graph": args.export_graph,
+    }
+
+    output = open(args.output, "w", encoding="utf-8") if args.output else sys.stdout
+    try:
+        for result in plan_many(scenarios, options, args.workers):
+            output.write(json.dumps(result) + "\n")
+    finally:
+        if output is not sys.stdout:
+            output.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,205 @@
+# Raster rendering for the GUIs: the map as one PhotoImage instead of one canvas item per cell.
+#
+# The static layers (sand texture and grid lines) are composed once into a background image.
+# Terrain, obstacles and trash are painted over it into a second image, the only canvas item
+# the map needs. Edits mark cells dirty; on the next idle callback each dirty row run is restored from
+# the background and repainted with Tk's photo copy/put, which blit in C. Redraw cost depends
+# on how many cells changed, not on the size of the map, and paths are one polyline each.
+#
+# The renderer keeps its own obstacle and trash layers, so it works with any pathfinder: the
+# GUI tells it what changed through set_obstacle(s), set_trash and set_terrain.
+
+from lazy_imports import lazy_import
+
+tk = lazy_import("tkinter")
+
+
+class MapRenderer:
+    def __init__(self, canvas, rows, cols, cell_size, texture=None, grid_colour=None,
+                 obstacle_colour="black", trash_colour="grey", obstacle_sprite=None, trash_sprite=None):
+        # Obstacles are filled with obstacle_colour and trash drawn as a disc of trash_colour,
+        # unless a cell-sized sprite image is given for them
+        self.canvas = canvas
+        self.rows = rows
+        self.cols = cols
+        self.cell_size = cell_size
+        self.width = cols * cell_size
+        self.height = rows * cell_size
+        self.obstacle_colour = obstacle_colour
+        self.obstacle_sprite = obstacle_sprite
+
+        self.obstacles = bytearray(rows * cols)
+        self.trash = bytearray(rows * cols)
+        self.terrain = [None] * (rows * cols)  # Fill colour of each cell, None for plain sand
+        self.dirty = set()
+        self.flush_job = None
+        self.paths = []
+
+        self.background = tk.PhotoImage(width=self.width, height=self.height)
+        self.paint_background(texture, grid_colour)
+        self.trash_sprite = trash_sprite or self.make_disc(trash_colour)
+        self.image = tk.PhotoImage(width=self.width, height=self.height)
+        self.item = None
+        self.reset()
+
+    # Static layers
+
+    def paint_background(self, texture, grid_colour):
+        if texture is not None:
+            self.copy(texture, self.background, to=(0, 0, self.width, self.height))  # Tiled
+        else:
+            self.background.put("white", to=(0, 0, self.width, self.height))
+        if grid_colour is not None:
+            for x in range(0, self.width + 1, self.cell_size):
+                self.background.put(grid_colour, to=(min(x, self.width - 1), 0, min(x, self.width - 1) + 1, self.height))
+            for y in range(0, self.height + 1, self.cell_size):
+                self.background.put(grid_colour, to=(0, min(y, self.height - 1), self.width, min(y, self.height - 1) + 1))
+
+    def make_disc(self, colour):
+        # Trash marker: a filled circle with a black outline, half a cell across, on a
+        # transparent cell-sized sprite
+        size = self.cell_size
+        sprite = tk.PhotoImage(width=size, height=size)
+        centre, radius = (size - 1) / 2, size / 4
+        for row in range(size):
+            dy = row - centre
+            if abs(dy) > radius:
+                continue
+            half = (radius * radius - dy * dy) ** 0.5
+            left, right = int(round(centre - half)), int(round(centre + half)) + 1
+            sprite.put("black", to=(left, row, right, row + 1))
+            if abs(dy) < radius - 1:
+                inner = (max((radius - 1) ** 2 - dy * dy, 0.0)) ** 0.5
+                inner_left, inner_right = int(round(centre - inner)), int(round(centre + inner)) + 1
+                if inner_right > inner_left:
+                    sprite.put(colour, to=(inner_left, row, inner_right, row + 1))
+        return sprite
+
+    @staticmethod
+    def copy(source, target, source_box=None, to=None):
+        arguments = [str(target), "copy", str(source)]
+        if source_box is not None:
+            arguments += ["-from", *source_box]
+        if to is not None:
+            arguments += ["-to", *to]
+        target.tk.call(*arguments)
+
+    # Layers that change
+
+    def reset(self):
+        # Blank map; also puts the image back on the canvas after canvas.delete("all")
+        self.obstacles = bytearray(self.rows * self.cols)
+        self.trash = bytearray(self.rows * self.cols)
+        self.terrain = [None] * (self.rows * self.cols)
+        self.dirty.clear()
+        self.paths = []
+        self.copy(self.background, self.image)
+        self.item = self.canvas.create_image(0, 0, anchor="nw", image=self.image)
+        self.canvas.tag_lower(self.item)
+
+    def set_obstacle(self, x, y, blocked=True):
+        index = x * self.cols + y
+        if self.obstacles[index] != blocked:
+            self.obstacles[index] = blocked
+            self.mark_dirty(index)
+
+    def set_obstacles(self, cells, blocked=True):
+        for x, y in cells:
+            index = x * self.cols + y
+            if self.obstacles[index] != blocked:
+                self.obstacles[index] = blocked
+                self.dirty.add(index)
+        self.schedule_flush()
+
+    def set_terrain(self, cells, colour):
+        for x, y in cells:
+            index = x * self.cols + y
+            if self.terrain[index] != colour:
+                self.terrain[index] = colour
+                self.dirty.add(index)
+        self.schedule_flush()
+
+    def set_trash(self, x, y, present=True):
+        index = x * self.cols + y
+        if self.trash[index] != present:
+            self.trash[index] = present
+            self.mark_dirty(index)
+
+    def load(self, obstacles, trash=None):
+        # Replace whole layers (flat arrays indexed x * cols + y), repainting only the
+        # cells that differ
+        for layer, new in ((self.obstacles, obstacles), (self.trash, trash)):
+            if new is None:
+                continue
+            for index in range(len(layer)):
+                if layer[index] != new[index]:
+                    layer[index] = new[index]
+                    self.dirty.add(index)
+        self.schedule_flush()
+
+    def mark_dirty(self, index):
+        self.dirty.add(index)
+        self.schedule_flush()
+
+    def schedule_flush(self):
+        if self.dirty and self.flush_job is None:
+            self.flush_job = self.canvas.after_idle(self.flush)
+
+    def flush(self):
+        # Repaint dirty cells, one background copy per run of adjacent dirty cells in a row
+        self.flush_job = None
+        cols, size = self.cols, self.cell_size
+        dirty = sorted(self.dirty)
+        self.dirty.clear()
+
+        run_start = 0
+        for i in range(1, len(dirty) + 1):
+            if i < len(dirty) and dirty[i] == dirty[i - 1] + 1 and dirty[i] % cols:
+                continue
+            x, y = divmod(dirty[run_start], cols)
+            length = dirty[i - 1] - dirty[run_start] + 1
+            box = (y * size, x * size, (y + length) * size, (x + 1) * size)
+            self.copy(self.background, self.image, source_box=box, to=box[:2])
+            self.paint_cells(dirty[run_start], length)
+            run_start = i
+
+    def paint_cells(self, first, length):
+        cols, size = self.cols, self.cell_size
+        obstacles, trash, terrain = self.obstacles, self.trash, self.terrain
+        index = first
+        while index < first + length:
+            x, y = divmod(index, cols)
+            if obstacles[index] and self.obstacle_sprite is not None:
+                self.copy(self.obstacle_sprite, self.image, to=(y * size, x * size))
+            elif obstacles[index]:
+                # Fill a whole run of obstacles with one put
+                end = index
+                while end + 1 < first + length and obstacles[end + 1]:
+                    end += 1
+                self.image.put(self.obstacle_colour, to=(y * size, x * size, (y + end - index + 1) * size, (x + 1) * size))
+                index = end + 1
+                continue
+            else:
+                if terrain[index] is not None:
+                    self.image.put(terrain[index], to=(y * size, x * size, (y + 1) * size, (x + 1) * size))
+                if trash[index]:
+                    self.copy(self.trash_sprite, self.image, to=(y * size, x * size))
+            index += 1
+
+    # Paths
+
+    def draw_path(self, path, colour, width=None, **options):
+        # One polyline through the cell centres; options go to create_line
+        if len(path) < 2:
+            return None
+        half = self.cell_size / 2
+        coords = [value for x, y in path for value in (y * self.cell_size + half, x * self.cell_size + half)]
+        item = self.canvas.create_line(*coords, fill=colour, width=width or self.cell_size // 4,
+                                       capstyle="round", joinstyle="round", **options)
+        self.paths.append(item)
+        return item
+
+    def clear_paths(self):
+        for item in self.paths:
+            self.canvas.delete(item)
+        self.paths = []
@@ -0,0 +1,161 @@
+# Opt-in search instrumentation for run_path, run_algorithm and iter_legs.
+#
+# Register an observer with astar.search_observers.append(observer). While the list is empty
+# run_path and run_algorithm take their usual route, so leaving instrumentation off costs
+# nothing beyond the few counters the search loop always keeps. With an observer registered,
+# every leg is timed and reported as a LegStats. Legs solved by AStarPathfinding.search (the
+# "astar" engine, with or without ALT landmarks, and JPS on weighted terrain) also report
+# generated nodes, the peak open-set size and re-openings. The other engines only report the
+# expansions they already track, and their other counters are None.
+#
+# "Peak open" is the most cells waiting on the open set at once. The open set is a heap with
+# lazy deletion, so the heap itself can be longer: the stale entries a decrease-key leaves
+# behind are not counted. "Re-openings" are pushes for a cell that was already on the open
+# set with a worse cost. The octile heuristic is consistent, so a cell is never expanded twice.
+
+import time
+
+from cost_model import INF
+
+
+class LegStats:
+    __slots__ = ("start", "end", "engine", "cached", "found", "cost", "expanded", "generated",
+                 "peak_open", "reopened", "seconds")
+
+    def __init__(self, start, end, engine):
+        self.start = start
+        self.end = end
+        self.engine = engine
+        self.cached = False
+        self.found = False
+        self.cost = INF
+        self.expanded = 0
+        self.generated = None
+        self.peak_open = None
+        self.reopened = None
+        self.seconds = 0.0
+
+
+class SearchObserver:
+    # Base class with no-op hooks; override the ones you need
+
+    def run_started(self, astar):
+        pass
+
+    def leg_finished(self, leg):
+        pass
+
+    def run_finished(self, found, seconds):
+        pass
+
+
+class SearchStats(SearchObserver):
+    # Collects the legs of the latest run_algorithm call (or of loose run_path calls)
+
+    def __init__(self):
+        self.legs = []
+        self.run_seconds = None
+        self.found = None
+
+    def run_started(self, astar):
+        self.legs = []
+        self.run_seconds = None
+        self.found = None
+
+    def leg_finished(self, leg):
+        self.legs.append(leg)
+
+    def run_finished(self, found, seconds):
+        self.found = found
+        self.run_seconds = seconds
+
+    def total(self, field):
+        values = [getattr(leg, field) for leg in self.legs if getattr(leg, field) is not None]
+        return sum(values) if values else None
+
+    def slowest_leg(self):
+        return max(range(len(self.legs)), key=lambda i: self.legs[i].seconds, default=None)
+
+    def summary(self):
+        if not self.legs:
+            return "No legs searched yet"
+
+        search_seconds = self.total("seconds")
+        parts = [f"{len(self.legs)} legs", f"{self.total('expanded'):,} expanded"]
+        generated = self.total("generated")
+        if generated is not None:
+            peak_open = max(leg.peak_open for leg in self.legs if leg.peak_open is not None)
+            parts += [f"{generated:,} generated", f"peak open {peak_open:,}",
+                      f"{self.total('reopened'):,} reopened"]
+            counted = sum(1 for leg in self.legs if leg.generated is not None)
+            if counted < len(self.legs):
+                parts[-3] += f" (on {counted} A* legs)"
+        cached = sum(1 for leg in self.legs if leg.cached)
+        if cached:
+            parts.append(f"{cached} from cache")
+        parts.append(f"search {search_seconds * 1000:.1f} ms")
+        if self.run_seconds is not None:
+            parts.append(f"ordering {max(self.run_seconds - search_seconds, 0.0) * 1000:.1f} ms")
+
+        slowest = self.slowest_leg()
+        leg = self.legs[slowest]
+        parts.append(f"slowest leg #{slowest + 1} ({leg.seconds * 1000:.1f} ms, {leg.expanded:,} expanded)")
+        return " | ".join(parts)
+
+
+def observed_run_algorithm(astar, plan_route):
+    observers = list(astar.search_observers)
+    for observer in observers:
+        observer.run_started(astar)
+    start_time = time.perf_counter()
+    path = plan_route()
+    elapsed = time.perf_counter() - start_time
+    for observer in observers:
+        observer.run_finished(path is not None, elapsed)
+    return path
+
+
+def observed_legs(astar, legs):
+    # observed_run_algorithm for a leg stream; the run only counts the time spent producing
+    # legs, not the time the caller spends between them
+    observers = list(astar.search_observers)
+    for observer in observers:
+        observer.run_started(astar)
+    elapsed, found = 0.0, True
+    while True:
+        start_time = time.perf_counter()
+        leg = next(legs, False)
+        elapsed += time.perf_counter() - start_time
+        if leg is False:
+            break
+        found = leg is not None
+        yield leg
+    for observer in observers:
+        observer.run_finished(found, elapsed)
+
+
+def observed_run_path(astar, start, end):
+    # Same as run_path, but timed and reported to every observer
+    leg = LegStats((start.x, start.y), (end.x, end.y), astar.engine)
+    cache = astar.path_cache
+    start_time = time.perf_counter()
+
+    cached = cache.lookup(start.index, end.index) if cache is not None else None
+    if cached is not None:
+        leg.cached = True
+        astar.expanded_count = 0
+        astar.last_cost = cached.cost
+        path = None if cached.path is None else list(cached.path)
+    else:
+        path = astar.solve_path(start, end, leg)
+        if cache is not None:
+            cache.store(start.index, end.index, None if path is None else list(path), astar.last_cost)
+
+    leg.seconds = time.perf_counter() - start_time
+    leg.found = path is not None
+    leg.cost = astar.last_cost
+    leg.expanded = astar.expanded_count
+    for observer in list(astar.search_observers):
+        observer.leg_finished(leg)
+    return path
+
@@ -0,0 +1,128 @@
+# Visitation order optimization for run_algorithm.
+#
+# Everything here works on a square distance matrix where node 0 is the robot's start and
+# node n - 1 is the end cell, so the problem is an open-path TSP with both endpoints fixed.
+# Orders are lists of node indices that always begin with 0 and end with n - 1.
+
+import math
+
+# Above this many intermediate stops the exact DP gets too slow and we use heuristics only
+EXACT_LIMIT = 10
+
+
+def tour_length(order, dist):
+    return sum(dist[a][b] for a, b in zip(order, order[1:]))
+
+
+def nearest_neighbor_tour(dist):
+    n = len(dist)
+    if n <= 2:
+        return list(range(n))
+
+    order = [0]
+    remaining = set(range(1, n - 1))
+    while remaining:
+        last = order[-1]
+        nearest = min(remaining, key=lambda node: (dist[last][node], node))
+        order.append(nearest)
+        remaining.remove(nearest)
+    order.append(n - 1)
+    return order
+
+
+def two_opt(order, dist):
+    # Reverse inner segments while that shortens the route. Endpoints never move.
+    order = list(order)
+    improved = True
+    while improved:
+        improved = False
+        for i in range(1, len(order) - 2):
+            for j in range(i + 1, len(order) - 1):
+                a, b = order[i - 1], order[i]
+                c, e = order[j], order[j + 1]
+                delta = dist[a][c] + dist[b][e] - dist[a][b] - dist[c][e]
+                if delta < -1e-9:
+                    order[i:j + 1] = reversed(order[i:j + 1])
+                    improved = True
+    return order
+
+
+def or_opt(order, dist):
+    # Move runs of one to three stops to a cheaper spot elsewhere in the route
+    order = list(order)
+    improved = True
+    while improved:
+        improved = False
+        for length in (1, 2, 3):
+            for i in range(1, len(order) - length):
+                segment = order[i:i + length]
+                before, after = order[i - 1], order[i + length]
+                removal_gain = dist[before][segment[0]] + dist[segment[-1]][after] - dist[before][after]
+
+                rest = order[:i] + order[i + length:]
+                best_delta, best_position = -1e-9, None
+                for k in range(len(rest) - 1):
+                    if k == i - 1:
+                        continue
+                    a, b = rest[k], rest[k + 1]
+                    delta = dist[a][segment[0]] + dist[segment[-1]][b] - dist[a][b] - removal_gain
+                    if delta < best_delta:
+                        best_delta, best_position = delta, k + 1
+
+                if best_position is not None:
+                    order = rest[:best_position] + segment + rest[best_position:]
+                    improved = True
+                    break
+            if improved:
+                break
+    return order
+
+
+def held_karp(dist):
+    # Exact open-path DP over subsets of the intermediate stops: O(2^m * m^2) for m stops
+    n = len(dist)
+    stops = list(range(1, n - 1))
+    m = len(stops)
+    if m == 0:
+        return list(range(n))
+
+    full = (1 << m) - 1
+    cost = [[math.inf] * m for _ in range(1 << m)]
+    parent = [[-1] * m for _ in range(1 << m)]
+    for i in range(m):
+        cost[1 << i][i] = dist[0][stops[i]]
+
+    for mask in range(1, 1 << m):
+        for last in range(m):
+            current = cost[mask][last]
+            if current == math.inf or not mask & (1 << last):
+                continue
+            for nxt in range(m):
+                if mask & (1 << nxt):
+                    continue
+                next_mask = mask | (1 << nxt)
+                candidate = current + dist[stops[last]][stops[nxt]]
+                if candidate < cost[next_mask][nxt]:
+                    cost[next_mask][nxt] = candidate
+                    parent[next_mask][nxt] = last
+
+    last = min(range(m), key=lambda i: cost[full][i] + dist[stops[i]][n - 1])
+    order, mask = [], full
+    while last != -1:
+        order.append(stops[last])
+        mask, last = mask ^ (1 << last), parent[mask][last]
+    return [0] + order[::-1] + [n - 1]
+
+
+def optimize_tour(dist, exact_limit=EXACT_LIMIT):
+    n = len(dist)
+    if n - 2 <= exact_limit:
+        return held_karp(dist)
+
+    order = nearest_neighbor_tour(dist)
+    # Alternate the two local searches until neither finds an improvement
+    while True:
+        length = tour_length(order, dist)
+        order = or_opt(two_opt(order, dist), dist)
+        if tour_length(order, dist) >= length - 1e-9:
+            return order
@@ -0,0 +1,65 @@
+"""Measure what any-angle smoothing does to planned routes.
+
+Plans the same seeded trash-collection route on each map with and without astar.any_angle and
+reports the number of waypoints (the segments the robot and the animation have to handle),
+the route length, and the planning time with and without the smoothing pass. Exits with 1
+if a smoothed route is ever longer than the grid route it came from.
+
+Usage: python benchmarks/bench_any_angle.py [--size 128] [--trash 10] [--seeds 5]
+"""
+
+import argparse
+import sys
+import time
+
+from maps import blob_obstacles, build_pathfinder, open_obstacles, place_trash, random_obstacles, scattered_trash
+
+MAPS = {
+    "open": lambda size, seed: open_obstacles(size, size),
+    "blobs": lambda size, seed: blob_obstacles(size, size, 0.2, seed),
+    "scattered": lambda size, seed: random_obstacles(size, size, 0.1, seed),
+}
+
+
+def plan(mask, size, trash, any_angle):
+    astar = build_pathfinder(size, size, mask)
+    place_trash(astar, trash)
+    astar.any_angle = any_angle
+    start_time = time.perf_counter()
+    path = astar.run_algorithm()
+    return path, astar.path_cost(path) if path else None, time.perf_counter() - start_time
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--size", type=int, default=128)
+    parser.add_argument("--trash", type=int, default=10)
+    parser.add_argument("--seeds", type=int, default=5)
+    args = parser.parse_args()
+
+    print(f"{'map':<10} {'waypoints':>17}  {'length':>19}  {'planning (s)':>17}")
+    longer = 0
+    for name, make_mask in MAPS.items():
+        totals = [0, 0, 0.0, 0.0, 0.0, 0.0]
+        for seed in range(args.seeds):
+            mask = make_mask(args.size, seed)
+            trash = scattered_trash(args.size, args.size, mask, args.trash, seed)
+            grid_path, grid_length, grid_time = plan(mask, args.size, trash, False)
+            smooth_path, smooth_length, smooth_time = plan(mask, args.size, trash, True)
+            if grid_path is None:
+                continue
+            longer += smooth_length > grid_length + 1e-9
+            for i, value in enumerate((len(grid_path), len(smooth_path), grid_length, smooth_length,
+                                       grid_time, smooth_time)):
+                totals[i] += value
+        grid_points, smooth_points, grid_length, smooth_length, grid_time, smooth_time = totals
+        print(f"{name:<10} {grid_points:>7} -> {smooth_points:>6}  {grid_length:>8.1f} -> {smooth_length:>7.1f}  "
+              f"{grid_time:>6.3f} -> {smooth_time:>6.3f}")
+
+    if longer:
+        print(f"{longer} smoothed routes were longer than their grid routes!")
+    return 1 if longer else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,80 @@
+"""Compare the run_path search engines on open and maze-like maps.
+
+For each map and engine it reports total node expansions and wall-clock time over the same
+set of seeded start/end pairs, and checks that every engine finds routes of equal cost.
+"cold" is the first pass on a freshly built map and includes any per-map preprocessing
+(such as the JPS jump tables); "warm" repeats the same queries on the unchanged map.
+
+Usage: python benchmarks/bench_engines.py [--size 200] [--queries 20]
+"""
+
+import argparse
+import random
+import sys
+import time
+
+from maps import build_pathfinder, maze_obstacles, open_obstacles, random_obstacles
+
+ENGINES = ("astar", "jps", "bidirectional")
+
+
+def free_cells(astar):
+    return [(x, y) for x in range(astar.rows) for y in range(astar.cols) if not astar.grid[x][y].is_obstacle]
+
+
+def run_queries(astar, engine, queries):
+    astar.engine = engine
+    expanded, forward, backward, costs = 0, 0, 0, []
+    start_time = time.perf_counter()
+    for (sx, sy), (ex, ey) in queries:
+        astar.run_path(astar.grid[sx][sy], astar.grid[ex][ey])
+        expanded += astar.expanded_count
+        forward += astar.expanded_per_direction[0]
+        backward += astar.expanded_per_direction[1]
+        costs.append(astar.last_cost)
+    return expanded, time.perf_counter() - start_time, costs, (forward, backward)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--size", type=int, default=200)
+    parser.add_argument("--queries", type=int, default=20)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    maps = {
+        "open": open_obstacles(args.size, args.size),
+        "sparse (5% obstacles)": random_obstacles(args.size, args.size, 0.05, args.seed),
+        "scattered (25% obstacles)": random_obstacles(args.size, args.size, 0.25, args.seed),
+        "maze": maze_obstacles(args.size, args.size, args.seed),
+    }
+
+    mismatches = 0
+    print(f"{'map':<27} {'engine':<13} {'expanded':>10} {'cold (s)':>9} {'warm (s)':>9}")
+    for name, obstacles in maps.items():
+        astar = build_pathfinder(args.size, args.size, obstacles)
+        rng = random.Random(args.seed)
+        cells = free_cells(astar)
+        queries = [(rng.choice(cells), rng.choice(cells)) for _ in range(args.queries)]
+
+        reference = None
+        for engine in ENGINES:
+            astar = build_pathfinder(args.size, args.size, obstacles)
+            astar.path_cache = None  # Time the searches, not repeated cache hits
+            expanded, cold, costs, (forward, backward) = run_queries(astar, engine, queries)
+            _, warm, _, _ = run_queries(astar, engine, queries)
+            line = f"{name:<27} {engine:<13} {expanded:>10} {cold:>9.3f} {warm:>9.3f}"
+            if engine == "bidirectional":
+                line += f"  (forward {forward}, backward {backward})"
+            print(line)
+            if reference is None:
+                reference = costs
+            elif any(abs(a - b) > 1e-9 for a, b in zip(reference, costs) if a != b):
+                mismatches += 1
+                print(f"  {engine} route costs differ from {ENGINES[0]}")
+
+    return 1 if mismatches else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
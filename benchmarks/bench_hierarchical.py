@@ -0,0 +1,82 @@
+"""Benchmark the hierarchical (HPA*) engine against flat A* on generated large maps.
+
+Reports the one-off abstraction build, per-query time and expansions for both engines on
+long seeded queries, how much longer the hierarchical routes are, and how long the next
+query's incremental rebuild takes after a handful of obstacle edits.
+
+Usage: python benchmarks/bench_hierarchical.py [--size 512] [--cluster-size 32] [--queries 10]
+"""
+
+import argparse
+import random
+import time
+
+from maps import blob_obstacles, build_pathfinder, random_obstacles
+from hierarchical import HierarchicalPathfinder
+
+
+def far_queries(astar, rng, count):
+    # Pairs from opposite halves of the map, so every query spans many clusters
+    queries = []
+    while len(queries) < count:
+        sx, sy = rng.randrange(astar.rows // 4), rng.randrange(astar.cols)
+        ex, ey = astar.rows - 1 - rng.randrange(astar.rows // 4), rng.randrange(astar.cols)
+        if not astar.grid[sx][sy].is_obstacle and not astar.grid[ex][ey].is_obstacle:
+            queries.append((astar.grid[sx][sy], astar.grid[ex][ey]))
+    return queries
+
+
+def time_engine(astar, engine, queries):
+    astar.engine = engine
+    expanded, costs = 0, []
+    start_time = time.perf_counter()
+    for start, end in queries:
+        astar.run_path(start, end)
+        expanded += astar.expanded_count
+        costs.append(astar.last_cost)
+    return (time.perf_counter() - start_time) / len(queries), expanded // len(queries), costs
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--size", type=int, default=512)
+    parser.add_argument("--density", type=float, default=0.2)
+    parser.add_argument("--map", choices=("blobs", "noise"), default="blobs",
+                        help="round obstacle blobs, or independent random cells")
+    parser.add_argument("--cluster-size", type=int, default=32)
+    parser.add_argument("--queries", type=int, default=10)
+    parser.add_argument("--edits", type=int, default=10)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    generator = blob_obstacles if args.map == "blobs" else random_obstacles
+    astar = build_pathfinder(args.size, args.size, generator(args.size, args.size, args.density, args.seed))
+    astar.cluster_size = args.cluster_size
+    queries = far_queries(astar, rng, args.queries)
+
+    start_time = time.perf_counter()
+    astar.hierarchy = HierarchicalPathfinder(astar, args.cluster_size)
+    astar.hierarchy.build()
+    build_time = time.perf_counter() - start_time
+
+    flat_time, flat_expanded, flat_costs = time_engine(astar, "astar", queries)
+    hpa_time, hpa_expanded, hpa_costs = time_engine(astar, "hierarchical", queries)
+    overhead = sum(h / f for h, f in zip(hpa_costs, flat_costs) if f) / len(queries) - 1
+
+    for _ in range(args.edits):
+        astar.set_obstacle(rng.randrange(args.size), rng.randrange(args.size))
+    start_time = time.perf_counter()
+    astar.hierarchy.ensure_built()
+    rebuild_time = time.perf_counter() - start_time
+
+    print(f"{args.map} map {args.size}x{args.size}, {args.density:.0%} obstacles, clusters of {args.cluster_size}")
+    print(f"abstraction build:        {build_time:8.3f} s")
+    print(f"flat A* per query:        {flat_time:8.3f} s  ({flat_expanded} expanded)")
+    print(f"hierarchical per query:   {hpa_time:8.3f} s  ({hpa_expanded} abstract nodes expanded)")
+    print(f"hierarchical route length: {overhead:+.1%} vs optimal")
+    print(f"rebuild after {args.edits} edits:   {rebuild_time:8.3f} s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+"""Measure how long the planner modules take to import, using python -X importtime.
+
+Each module is imported in a fresh interpreter several times and the fastest cumulative time
+is reported, together with the heavy modules (tkinter, matplotlib, numpy) it pulled in. With
+--check the script exits non-zero when a headless module loads one of them or goes over its
+time budget, so startup regressions can be caught in CI.
+
+Usage: python benchmarks/bench_import_time.py [--repeat 5] [--check] [--budget-ms 25]
+"""
+
+import argparse
+import os
+import subprocess
+import sys
+
+A_STAR_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "A_Star")
+
+# Modules that batch workers import; they must never load GUI or plotting code
+HEADLESS_MODULES = ["pathfinding", "map_io", "plan_batch"]
+GUI_MODULES = ["AStar_Final", "AStar_Blank", "AStar_Grid", "AStar_Sand"]
+HEAVY_MODULES = ("tkinter", "_tkinter", "matplotlib", "numpy")
+
+
+def import_profile(module):
+    # Returns (cumulative microseconds for module, names of every module imported)
+    result = subprocess.run([sys.executable, "-X", "importtime", "-c", f"import {module}"],
+                            cwd=A_STAR_DIR, capture_output=True, text=True, check=True)
+    cumulative, imported = None, []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative_us, name = line.split("|")
+        name = name.strip()
+        imported.append(name)
+        if name == module:
+            cumulative = int(cumulative_us)
+    return cumulative, imported
+
+
+def measure(module, repeat):
+    best, imported = None, []
+    for _ in range(repeat):
+        cumulative, imported = import_profile(module)
+        if best is None or cumulative < best:
+            best = cumulative
+    heavy = sorted({name.split(".")[0] for name in imported if name.split(".")[0] in HEAVY_MODULES})
+    return best, heavy
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--check", action="store_true", help="fail on heavy imports or a blown budget")
+    parser.add_argument("--budget-ms", type=float, default=25.0, help="import budget per headless module")
+    args = parser.parse_args()
+
+    failures = []
+    print(f"{'module':<14}  {'import (ms)':>11}  heavy modules loaded")
+    for module in HEADLESS_MODULES + GUI_MODULES:
+        best, heavy = measure(module, args.repeat)
+        print(f"{module:<14}  {best / 1000:>11.2f}  {', '.join(heavy) or '-'}")
+        if module in HEADLESS_MODULES:
+            if heavy:
+                failures.append(f"{module} imports {', '.join(heavy)}")
+            if best / 1000 > args.budget_ms:
+                failures.append(f"{module} took {best / 1000:.2f} ms (budget {args.budget_ms} ms)")
+
+    if args.check and failures:
+        print("\n".join(["", "FAILED:"] + failures))
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
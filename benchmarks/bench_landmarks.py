@@ -0,0 +1,96 @@
+"""Benchmark ALT landmark heuristics against plain A* on repeated queries over one map.
+
+Reports the one-off landmark table build, per-query time and expansions with and without
+landmarks on the same seeded queries (the leg cache is off, so every query searches), checks
+that both find routes of the same cost, and times the lazy rebuild on the first query after
+a few obstacle edits.
+
+Usage: python benchmarks/bench_landmarks.py [--size 256] [--map maze] [--landmarks 4 8 16] [--queries 50]
+"""
+
+import argparse
+import random
+import sys
+import time
+
+from maps import blob_obstacles, build_pathfinder, corridor_obstacles, maze_obstacles, random_obstacles
+
+MAPS = {
+    "random": lambda size, seed: random_obstacles(size, size, 0.25, seed),
+    "blobs": lambda size, seed: blob_obstacles(size, size, 0.2, seed),
+    "corridors": lambda size, seed: corridor_obstacles(size, size, seed),
+    "maze": lambda size, seed: maze_obstacles(size, size, seed),
+}
+
+
+def make_queries(astar, count, seed):
+    rng = random.Random(seed)
+    size = astar.rows * astar.cols
+    queries = []
+    while len(queries) < count:
+        start, end = rng.randrange(size), rng.randrange(size)
+        if not astar.obstacles[start] and not astar.obstacles[end]:
+            queries.append((astar.cell_at(start), astar.cell_at(end)))
+    return queries
+
+
+def run_queries(astar, queries):
+    expanded, costs = 0, []
+    start_time = time.perf_counter()
+    for start, end in queries:
+        astar.run_path(start, end)
+        expanded += astar.expanded_count
+        costs.append(astar.last_cost)
+    return (time.perf_counter() - start_time) / len(queries), expanded // len(queries), costs
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--size", type=int, default=256)
+    parser.add_argument("--map", choices=sorted(MAPS), default="maze")
+    parser.add_argument("--landmarks", type=int, nargs="+", default=[4, 8, 16])
+    parser.add_argument("--queries", type=int, default=50)
+    parser.add_argument("--edits", type=int, default=10)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    mask = MAPS[args.map](args.size, args.seed)
+    astar = build_pathfinder(args.size, args.size, mask)
+    astar.path_cache = None
+    queries = make_queries(astar, args.queries, args.seed)
+
+    base_time, base_expanded, base_costs = run_queries(astar, queries)
+    print(f"{args.map} map {args.size}x{args.size}, {len(queries)} queries")
+    print(f"{'landmarks':>9}  {'build (s)':>9}  {'query (ms)':>10}  {'expanded':>8}  {'speedup':>7}  {'rebuild (s)':>11}")
+    print(f"{'-':>9}  {'-':>9}  {base_time * 1000:>10.2f}  {base_expanded:>8}  {'1.00x':>7}  {'-':>11}")
+
+    mismatches = 0
+    for count in args.landmarks:
+        astar.landmark_count = count
+        astar.landmarks = None
+        start_time = time.perf_counter()
+        astar.run_path(*queries[0])
+        build_time = time.perf_counter() - start_time
+
+        query_time, expanded, costs = run_queries(astar, queries)
+        mismatches += sum(abs(cost - base) > 1e-9 for cost, base in zip(costs, base_costs))
+
+        # Edits only mark the tables stale; the next query pays for the rebuild
+        rng = random.Random(args.seed + count)
+        edits = [(rng.randrange(args.size), rng.randrange(args.size)) for _ in range(args.edits)]
+        edited = astar.set_obstacles(edits)
+        start_time = time.perf_counter()
+        astar.landmarks.ensure_built()
+        rebuild_time = time.perf_counter() - start_time
+        astar.set_obstacles(edited, blocked=False)
+
+        print(f"{count:>9}  {build_time:>9.3f}  {query_time * 1000:>10.2f}  {expanded:>8}  "
+              f"{base_time / query_time:>6.2f}x  {rebuild_time:>11.3f}")
+
+    if mismatches:
+        print(f"{mismatches} queries found a route of a different cost than plain A*!")
+    return 1 if mismatches else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
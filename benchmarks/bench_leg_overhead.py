@@ -0,0 +1,45 @@
+"""Measure the fixed per-leg cost of run_path on growing grids.
+
+Every leg is a short hop between neighbouring trash, so any time that grows with the grid
+size is per-search setup overhead rather than search work.
+
+Usage: python benchmarks/bench_leg_overhead.py [--legs 50] [--sizes 100 500 1000]
+"""
+
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "A_Star"))
+
+from pathfinding import AStarPathfinding
+
+
+def time_short_legs(size, legs):
+    astar = AStarPathfinding(size, size)
+    # A row of trash two cells apart near the start, so each search only touches a few cells
+    cells = [astar.grid[0][2 * i] for i in range(min(legs + 1, size // 2))]
+
+    start_time = time.perf_counter()
+    for i in range(len(cells) - 1):
+        astar.run_path(cells[i], cells[i + 1])
+    elapsed = time.perf_counter() - start_time
+
+    return elapsed / (len(cells) - 1)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--legs", type=int, default=50)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100, 250, 500, 1000, 2000])
+    args = parser.parse_args()
+
+    print(f"{'grid':>11}  {'per leg (ms)':>12}")
+    for size in args.sizes:
+        per_leg = time_short_legs(size, args.legs)
+        print(f"{size:>5}x{size:<5}  {per_leg * 1000:>12.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+"""Measure how run_algorithm scales with worker processes.
+
+The same seeded map and trash are planned with 1, 2, 4 and 8 workers. "cold" includes
+starting the pool and each worker's first look at the grid; "warm" replans with the leg cache
+cleared, so every distance row and leg is searched again by the already-running workers.
+Every parallel route is checked against the serial one.
+
+Usage: python benchmarks/bench_parallel.py [--size 512] [--trash 24] [--workers 1 2 4 8]
+"""
+
+import argparse
+import os
+import sys
+import time
+
+from maps import blob_obstacles, build_pathfinder, place_trash, scattered_trash
+
+
+def plan(size, mask, trash, workers):
+    astar = build_pathfinder(size, size, mask)
+    place_trash(astar, trash)
+    astar.workers = workers
+    try:
+        start_time = time.perf_counter()
+        path = astar.run_algorithm()
+        cold = time.perf_counter() - start_time
+
+        astar.path_cache.clear()
+        start_time = time.perf_counter()
+        astar.run_algorithm()
+        warm = time.perf_counter() - start_time
+    finally:
+        astar.close_workers()
+    return path, cold, warm
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--size", type=int, default=512)
+    parser.add_argument("--density", type=float, default=0.2)
+    parser.add_argument("--trash", type=int, default=24)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4, 8])
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    mask = blob_obstacles(args.size, args.size, args.density, args.seed)
+    trash = scattered_trash(args.size, args.size, mask, args.trash, args.seed)
+    print(f"{args.size}x{args.size} blobs, {len(trash)} trash, {os.cpu_count()} CPUs")
+    print(f"{'workers':>7}  {'cold (s)':>9}  {'warm (s)':>9}  {'speedup':>7}")
+
+    reference, serial_time, mismatches = None, None, 0
+    for workers in args.workers:
+        path, cold, warm = plan(args.size, mask, trash, workers)
+        if reference is None:
+            reference, serial_time = path, warm
+        elif path != reference:
+            mismatches += 1
+        note = "" if path == reference else "  route differs from the first run!"
+        print(f"{workers:>7}  {cold:>9.3f}  {warm:>9.3f}  {serial_time / warm:>6.2f}x{note}")
+
+    return 1 if mismatches else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,220 @@
+"""Reproducible benchmark suite for run_path, every search engine and run_algorithm.
+
+Maps come from the seeded generators in maps.py (open beach, random obstacles, blobs,
+corridors and mazes) at each requested size, so the same arguments always produce the same
+maps, queries and trash. For every map it times a fixed set of start/end queries with each
+engine, "cold" on a freshly built pathfinder (including per-map preprocessing such as JPS jump
+tables or the HPA* abstraction) and "warm" on the second pass, with the leg cache disabled so
+both passes really search. It records node expansions, checks that every engine matches the
+cost of plain A* (the hierarchical engine is near-optimal, so its overhead is reported
+instead), and measures peak traced memory with tracemalloc in a separate pass so tracing
+does not distort the timings. run_algorithm is timed on clustered trash.
+
+Results are written as JSON with the commit, Python version and arguments, and --compare
+prints the time and expansion ratios against an earlier results file.
+
+Usage:
+    python benchmarks/bench_suite.py --output before.json
+    python benchmarks/bench_suite.py --sizes 15 256 4096 --maps maze corridors --output after.json --compare before.json
+"""
+
+import argparse
+import datetime
+import json
+import platform
+import random
+import subprocess
+import sys
+import time
+import tracemalloc
+
+from maps import (beach_obstacles, blob_obstacles, build_pathfinder, clustered_trash, corridor_obstacles,
+                  maze_obstacles, place_trash, random_obstacles)
+
+MAPS = {
+    "beach": lambda rows, cols, seed: beach_obstacles(rows, cols, seed),
+    "random": lambda rows, cols, seed: random_obstacles(rows, cols, 0.25, seed),
+    "blobs": lambda rows, cols, seed: blob_obstacles(rows, cols, 0.2, seed),
+    "corridors": lambda rows, cols, seed: corridor_obstacles(rows, cols, seed),
+    "maze": lambda rows, cols, seed: maze_obstacles(rows, cols, seed),
+}
+ENGINES = ("astar", "jps", "bidirectional", "hierarchical")
+
+
+def git_commit():
+    try:
+        result = subprocess.run(["git", "rev-parse", "HEAD"], capture_output=True, text=True, check=True)
+        return result.stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def make_queries(astar, count, seed):
+    # Seeded start/end pairs on free cells, sampled without listing the whole map
+    rng = random.Random(seed)
+    rows, cols, obstacles = astar.rows, astar.cols, astar.obstacles
+    queries = []
+    while len(queries) < count:
+        start, end = rng.randrange(rows * cols), rng.randrange(rows * cols)
+        if not obstacles[start] and not obstacles[end]:
+            queries.append((astar.cell_at(start), astar.cell_at(end)))
+    return queries
+
+
+def fresh_pathfinder(size, mask, engine):
+    astar = build_pathfinder(size, size, mask)
+    astar.engine = engine
+    astar.path_cache = None
+    return astar
+
+
+def run_queries(astar, queries):
+    expanded, costs = 0, []
+    start_time = time.perf_counter()
+    for start, end in queries:
+        astar.run_path(start, end)
+        expanded += astar.expanded_count
+        costs.append(astar.last_cost)
+    return time.perf_counter() - start_time, expanded, costs
+
+
+def peak_memory(function):
+    tracemalloc.start()
+    try:
+        function()
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def bench_engine(size, mask, engine, queries_cells, reference, memory=True):
+    astar = fresh_pathfinder(size, mask, engine)
+    queries = [(astar.grid[s.x][s.y], astar.grid[e.x][e.y]) for s, e in queries_cells]
+    cold, expanded, costs = run_queries(astar, queries)
+    warm, _, _ = run_queries(astar, queries)
+
+    peak = None
+    if memory:
+        astar = fresh_pathfinder(size, mask, engine)
+        peak = peak_memory(lambda: run_queries(astar, queries))
+
+    result = {"kind": "run_path", "engine": engine, "queries": len(queries), "expanded": expanded,
+              "cold_seconds": cold, "warm_seconds": warm, "peak_bytes": peak}
+    if reference is not None:
+        found = [(ref, cost) for ref, cost in zip(reference, costs) if ref not in (0.0, float("inf"))]
+        result["mismatches"] = sum(1 for ref, cost in zip(reference, costs) if abs(ref - cost) > 1e-9)
+        result["cost_overhead"] = (sum(cost / ref for ref, cost in found) / len(found) - 1) if found else 0.0
+    return result, costs
+
+
+def bench_algorithm(size, mask, trash, seed, memory=True):
+    astar = build_pathfinder(size, size, mask)
+    place_trash(astar, clustered_trash(size, size, mask, trash, seed))
+    start_time = time.perf_counter()
+    path = astar.run_algorithm()
+    elapsed = time.perf_counter() - start_time
+
+    peak = None
+    if memory:
+        astar = build_pathfinder(size, size, mask)
+        place_trash(astar, clustered_trash(size, size, mask, trash, seed))
+        peak = peak_memory(astar.run_algorithm)
+
+    return {"kind": "run_algorithm", "engine": astar.engine, "trash": len(astar.trash_positions),
+            "found": path is not None, "seconds": elapsed, "peak_bytes": peak,
+            "distance": astar.path_cost(path) if path else None,
+            "placement_order_distance": astar.click_order_distance,
+            "optimized_order_distance": astar.optimized_distance}
+
+
+def megabytes(size):
+    return f"{'-':>8}" if size is None else f"{size / 2 ** 20:>8.1f}"
+
+
+def compare(results, baseline_path, arguments):
+    with open(baseline_path, encoding="utf-8") as file:
+        baseline = json.load(file)
+    key = lambda r: (r["map"], r["size"], r["kind"], r["engine"])
+    previous = {key(r): r for r in baseline["results"]}
+    for name in ("queries", "trash", "seed"):
+        if baseline["meta"]["arguments"].get(name) != arguments[name]:
+            print(f"\nwarning: --{name} differs from the baseline run, so the ratios are not like for like")
+
+    print(f"\ncompared with {baseline_path} (commit {str(baseline['meta'].get('commit'))[:10]}); ratio = now / before")
+    print(f"{'map':<10} {'size':>5} {'benchmark':<24} {'time':>7} {'expanded':>9} {'memory':>7}")
+    for result in results:
+        before = previous.get(key(result))
+        if before is None:
+            continue
+        time_key = "cold_seconds" if result["kind"] == "run_path" else "seconds"
+        ratio = lambda field: f"{result[field] / before[field]:.2f}x" if before.get(field) and result.get(field) else "-"
+        print(f"{result['map']:<10} {result['size']:>5} {result['kind'] + ' ' + result['engine']:<24} "
+              f"{ratio(time_key):>7} {ratio('expanded') if 'expanded' in result else '-':>9} {ratio('peak_bytes'):>7}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[15, 64, 256, 1024],
+                        help="square map sizes; up to 4096 works but takes a while")
+    parser.add_argument("--maps", nargs="+", choices=list(MAPS), default=list(MAPS))
+    parser.add_argument("--engines", nargs="+", choices=ENGINES, default=list(ENGINES))
+    parser.add_argument("--queries", type=int, default=10)
+    parser.add_argument("--trash", type=int, default=8)
+    parser.add_argument("--algorithm-max-size", type=int, default=1024,
+                        help="skip run_algorithm on larger maps (it runs a full Dijkstra per stop)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--no-memory", action="store_true",
+                        help="skip the tracemalloc passes, which are much slower than the timed ones")
+    parser.add_argument("--output", "-o", help="write results as JSON to this file")
+    parser.add_argument("--compare", help="results file from an earlier run to compare against")
+    args = parser.parse_args()
+
+    results = []
+    print(f"{'map':<10} {'size':>5} {'benchmark':<24} {'expanded':>10} {'cold (s)':>9} {'warm (s)':>9} {'peak MB':>8}")
+    for size in args.sizes:
+        for name in args.maps:
+            start_time = time.perf_counter()
+            mask = MAPS[name](size, size, args.seed)
+            build_seconds = time.perf_counter() - start_time
+            queries = make_queries(build_pathfinder(size, size, mask), args.queries, args.seed)
+
+            reference = None
+            for engine in args.engines:
+                result, costs = bench_engine(size, mask, engine, queries, reference, not args.no_memory)
+                reference = reference or costs
+                result.update(map=name, size=size, map_build_seconds=build_seconds)
+                results.append(result)
+                note = ""
+                if result.get("mismatches"):
+                    note = f"  cost {result['cost_overhead']:+.1%} on {result['mismatches']} queries"
+                print(f"{name:<10} {size:>5} {'run_path ' + engine:<24} {result['expanded']:>10} "
+                      f"{result['cold_seconds']:>9.3f} {result['warm_seconds']:>9.3f} "
+                      f"{megabytes(result['peak_bytes'])}{note}")
+
+            if size <= args.algorithm_max_size:
+                result = bench_algorithm(size, mask, args.trash, args.seed, not args.no_memory)
+                result.update(map=name, size=size)
+                results.append(result)
+                print(f"{name:<10} {size:>5} {'run_algorithm':<24} {'':>10} {result['seconds']:>9.3f} "
+                      f"{'':>9} {megabytes(result['peak_bytes'])}")
+
+    report = {
+        "meta": {
+            "commit": git_commit(),
+            "python": sys.version.split()[0],
+            "implementation": platform.python_implementation(),
+            "machine": platform.machine(),
+            "timestamp": datetime.datetime.now(datetime.timezone.utc).isoformat(timespec="seconds"),
+            "arguments": {key: value for key, value in vars(args).items() if key not in ("output", "compare")},
+        },
+        "results": results,
+    }
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as file:
+            json.dump(report, file, indent=1)
+    if args.compare:
+        compare(results, args.compare, vars(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+"""Check that the hierarchical (HPA*) engine finds a route whenever flat A* does.
+
+hierarchical_search quietly falls back to a flat search when the abstract graph finds no
+route, so a gap in the abstract graph only shows up as slow queries. This script calls
+HierarchicalPathfinder.find_path directly on seeded random maps, with queries that start and
+end on cluster entrances as well as on random cells, plus a walled map whose only door
+starts at the query's start cell. Every route must be made of legal moves and exist exactly
+when flat A* finds one. Exits non-zero on any mismatch.
+
+Usage: python benchmarks/check_hierarchical.py [--maps 40] [--size 60] [--cluster-size 8]
+"""
+
+import argparse
+import random
+import sys
+
+from maps import build_pathfinder, random_obstacles
+from pathfinding import AStarPathfinding
+from hierarchical import HierarchicalPathfinder
+
+
+def legal(astar, path):
+    cols = astar.cols
+    for (x1, y1), (x2, y2) in zip(path, path[1:]):
+        if x2 * cols + y2 not in {neighbor for neighbor, _ in astar.neighbor_steps(x1 * cols + y1)}:
+            return False
+    return True
+
+
+def check(astar, hierarchy, start_index, end_index):
+    path = hierarchy.find_path(start_index, end_index)
+    reference = astar.search(start_index, end_index)
+    if (path is None) != (reference is None):
+        return "no route" if path is None else "a route flat A* can't find"
+    if path is not None and not (path[0] == divmod(start_index, astar.cols) and
+                                 path[-1] == divmod(end_index, astar.cols) and legal(astar, path)):
+        return "an illegal route"
+    return None
+
+
+def door_map():
+    # A wall across columns 4-5 with one door at row 2; the start sits in the door
+    astar = AStarPathfinding(10, 40)
+    astar.set_obstacles([(x, y) for x in range(10) for y in (4, 5) if x != 2])
+    return astar, HierarchicalPathfinder(astar, 5), [(2 * 40 + 4, 9 * 40 + 39), (9 * 40 + 39, 2 * 40 + 4)]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--maps", type=int, default=40)
+    parser.add_argument("--size", type=int, default=60)
+    parser.add_argument("--cluster-size", type=int, default=8)
+    parser.add_argument("--queries", type=int, default=20)
+    args = parser.parse_args()
+
+    cases = [("door map", *door_map())]
+    for seed in range(args.maps):
+        rng = random.Random(seed)
+        astar = build_pathfinder(args.size, args.size,
+                                 random_obstacles(args.size, args.size, rng.uniform(0.0, 0.35), seed))
+        astar.allow_corner_cutting = rng.random() < 0.5
+        hierarchy = HierarchicalPathfinder(astar, args.cluster_size)
+        hierarchy.ensure_built()
+        free = [index for index in range(args.size * args.size) if not astar.obstacles[index]]
+        entrances = sorted(hierarchy.inter_edges) or free
+        queries = []
+        for _ in range(args.queries):
+            start = rng.choice(entrances if rng.random() < 0.5 else free)
+            end = rng.choice(entrances if rng.random() < 0.5 else free)
+            queries.append((start, end))
+        cases.append((f"seed {seed}", astar, hierarchy, queries))
+
+    failures = checked = 0
+    for name, astar, hierarchy, queries in cases:
+        for start_index, end_index in queries:
+            checked += 1
+            problem = check(astar, hierarchy, start_index, end_index)
+            if problem:
+                failures += 1
+                print(f"{name}: {divmod(start_index, astar.cols)} -> {divmod(end_index, astar.cols)}: "
+                      f"HPA* found {problem}")
+
+    print(f"queries: {checked}, mismatches: {failures}")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,60 @@
+"""Check run_path against a Dijkstra reference on seeded random maps.
+
+For every map the A* route must cost exactly as much as the Dijkstra route; the script
+also reports how many cells each search expanded. Exits non-zero on any mismatch.
+
+With --landmarks K the A* searches use ALT landmark heuristics from K landmarks.
+
+Usage: python benchmarks/check_optimality.py [--maps 200] [--size 60] [--landmarks 8]
+"""
+
+import argparse
+import random
+import sys
+
+from maps import build_pathfinder, random_obstacles
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--maps", type=int, default=200)
+    parser.add_argument("--size", type=int, default=60)
+    parser.add_argument("--no-corner-cutting", action="store_true")
+    parser.add_argument("--landmarks", type=int, default=0)
+    args = parser.parse_args()
+
+    failures = 0
+    astar_expanded = dijkstra_expanded = 0
+    for seed in range(args.maps):
+        rng = random.Random(seed)
+        density = rng.uniform(0.0, 0.35)
+        astar = build_pathfinder(args.size, args.size, random_obstacles(args.size, args.size, density, seed))
+        astar.allow_corner_cutting = not args.no_corner_cutting
+        astar.landmark_count = args.landmarks
+
+        start = astar.grid[rng.randrange(args.size)][rng.randrange(args.size)]
+        end = astar.grid[rng.randrange(args.size)][rng.randrange(args.size)]
+        if start.is_obstacle or end.is_obstacle:
+            continue
+
+        path = astar.run_path(start, end)
+        astar_cost, astar_count = astar.last_cost, astar.expanded_count
+        reference = astar.run_dijkstra(start, end)
+        dijkstra_cost, dijkstra_count = astar.last_cost, astar.expanded_count
+
+        if (path is None) != (reference is None) or abs(astar_cost - dijkstra_cost) > 1e-9 or (
+                path and abs(astar.path_cost(path) - astar_cost) > 1e-9):
+            failures += 1
+            print(f"seed {seed}: A* cost {astar_cost} != Dijkstra cost {dijkstra_cost}")
+
+        astar_expanded += astar_count
+        dijkstra_expanded += dijkstra_count
+
+    print(f"maps: {args.maps}, mismatches: {failures}")
+    print(f"expanded cells  A*: {astar_expanded}  Dijkstra: {dijkstra_expanded}  "
+          f"({100 * (1 - astar_expanded / max(dijkstra_expanded, 1)):.1f}% fewer)")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,101 @@
+"""Check route repairs against fresh searches on seeded random maps.
+
+For every map a robot follows its planned route from the top-left to the bottom-right corner.
+Between moves the map is edited around the route ahead (new obstacles, cleared obstacles
+and, on weighted maps, terrain) and the route is repaired with repair_route, which answers the
+first repair of a leg with a fresh search and later ones with D* Lite. Every repaired
+leg must be made of legal moves and cost exactly as much as a fresh Dijkstra search from
+the robot's cell, and must be missing exactly when the fresh search finds no route.
+Exits non-zero on any mismatch.
+
+Usage: python benchmarks/check_replanning.py [--maps 300] [--size 24] [--steps 12]
+"""
+
+import argparse
+import random
+import sys
+
+from maps import build_pathfinder, random_obstacles
+
+from cost_model import TERRAIN_COSTS
+
+
+def edit_map(astar, rng, route, position):
+    # A few obstacles and terrain patches near the route ahead, and some cleared obstacles
+    rows, cols = astar.rows, astar.cols
+    robot, goal = route[position], route[-1]
+    ahead = route[position + 1:] or [goal]
+    cells = []
+    for _ in range(rng.randint(1, 4)):
+        x, y = rng.choice(ahead)
+        cells.append((min(max(x + rng.randint(-1, 1), 0), rows - 1), min(max(y + rng.randint(-1, 1), 0), cols - 1)))
+    astar.set_obstacles([cell for cell in cells if cell != robot and cell != goal])
+
+    blocked = [divmod(index, cols) for index in range(rows * cols) if astar.obstacles[index]]
+    if blocked and rng.random() < 0.5:
+        astar.set_obstacles(rng.sample(blocked, min(len(blocked), rng.randint(1, 4))), blocked=False)
+
+    if astar.weighted and rng.random() < 0.5:
+        x, y = rng.choice(ahead)
+        patch = [(px, py) for px in range(max(x - 1, 0), min(x + 2, rows))
+                 for py in range(max(y - 1, 0), min(y + 2, cols))]
+        astar.set_terrain(patch, rng.choice(list(TERRAIN_COSTS.values())))
+
+
+def legal(astar, leg):
+    cols = astar.cols
+    for (x1, y1), (x2, y2) in zip(leg, leg[1:]):
+        targets = {neighbor for neighbor, _ in astar.neighbor_steps(x1 * cols + y1)}
+        if x2 * cols + y2 not in targets:
+            return False
+    return True
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--maps", type=int, default=300)
+    parser.add_argument("--size", type=int, default=24)
+    parser.add_argument("--steps", type=int, default=12)
+    args = parser.parse_args()
+
+    failures = repairs = 0
+    for seed in range(args.maps):
+        rng = random.Random(seed)
+        rows, cols = rng.randint(6, args.size), rng.randint(6, args.size)
+        astar = build_pathfinder(rows, cols, random_obstacles(rows, cols, rng.uniform(0.0, 0.3), seed))
+        astar.allow_corner_cutting = rng.random() < 0.5
+        if rng.random() < 0.5:
+            astar.load_terrain(rng.choice(list(TERRAIN_COSTS.values())) for _ in range(rows * cols))
+        astar.route_stops = [astar.start, astar.end]
+
+        path = astar.run_path(astar.start, astar.end)
+        if path is None:
+            continue
+        route, position = list(path), 0
+        for step in range(args.steps):
+            position = min(position + rng.randint(1, 3), len(route) - 1)
+            if route[position] == route[-1]:
+                break
+            edit_map(astar, rng, route, position)
+
+            x, y = route[position]
+            leg = astar.repair_route((x, y), route[position + 1:])
+            reference = astar.run_dijkstra(astar.grid[x][y], astar.end)
+            repairs += 1
+            if (leg is None) != (reference is None) or (leg and (
+                    leg[0] != (x, y) or leg[-1] != route[-1] or not legal(astar, leg) or
+                    abs(astar.path_cost(leg) - astar.last_cost) > 1e-9)):
+                failures += 1
+                found = "no route" if leg is None else f"cost {astar.path_cost(leg)}"
+                print(f"seed {seed}, step {step}: repair gave {found}, fresh search cost {astar.last_cost}")
+                break
+            if leg is None:
+                break
+            route, position = leg, 0
+
+    print(f"maps: {args.maps}, repairs: {repairs}, mismatches: {failures}")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,131 @@
+"""Seeded map generators shared by the benchmark scripts.
+
+Generators return an obstacle mask: a bytearray of rows * cols cells indexed by x * cols + y,
+with 1 for blocked cells, the same layout as AStarPathfinding.obstacles. Masks stay compact
+on 4096x4096 maps where a set of coordinates would not. build_pathfinder turns a mask into an
+AStarPathfinding with the start and end corners kept free, and the trash generators pick
+free cells to place trash on.
+"""
+
+import os
+import random
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "A_Star"))
+
+from pathfinding import AStarPathfinding
+
+
+def open_obstacles(rows, cols, seed=None):
+    # Nothing but sand
+    return bytearray(rows * cols)
+
+
+def random_obstacles(rows, cols, density, seed):
+    rng = random.Random(seed)
+    draw = rng.random
+    return bytearray(draw() < density for _ in range(rows * cols))
+
+
+def blob_obstacles(rows, cols, coverage, seed, max_radius=12):
+    # Round rocks and debris of random size until roughly `coverage` of the map is blocked
+    rng = random.Random(seed)
+    mask = bytearray(rows * cols)
+    blocked, target = 0, coverage * rows * cols
+    while blocked < target:
+        cx, cy = rng.randrange(rows), rng.randrange(cols)
+        radius = rng.randint(1, max_radius)
+        for x in range(max(cx - radius, 0), min(cx + radius + 1, rows)):
+            for y in range(max(cy - radius, 0), min(cy + radius + 1, cols)):
+                index = x * cols + y
+                if not mask[index] and (x - cx) ** 2 + (y - cy) ** 2 <= radius * radius:
+                    mask[index] = 1
+                    blocked += 1
+    return mask
+
+
+def beach_obstacles(rows, cols, seed):
+    # Mostly open sand with a few small rocks scattered around
+    return blob_obstacles(rows, cols, 0.03, seed, max_radius=3)
+
+
+def corridor_obstacles(rows, cols, seed, spacing=8, door_width=2):
+    # Walls across the map every `spacing` rows, each with one to three doorways, so routes
+    # have to zig-zag between far-apart openings
+    rng = random.Random(seed)
+    mask = bytearray(rows * cols)
+    for x in range(spacing, rows - 1, spacing):
+        mask[x * cols:(x + 1) * cols] = b"\x01" * cols
+        for _ in range(rng.randint(1, 3)):
+            door = rng.randrange(max(cols - door_width, 1))
+            for y in range(door, min(door + door_width, cols)):
+                mask[x * cols + y] = 0
+    return mask
+
+
+def maze_obstacles(rows, cols, seed):
+    # Recursive-backtracker maze with one-cell corridors on the even rows and columns
+    rng = random.Random(seed)
+    mask = bytearray(b"\x01") * (rows * cols)
+    stack = [(0, 0)]
+    mask[0] = 0
+    while stack:
+        x, y = stack[-1]
+        options = [(x + dx, y + dy, x + dx // 2, y + dy // 2)
+                   for dx, dy in ((2, 0), (-2, 0), (0, 2), (0, -2))
+                   if 0 <= x + dx < rows and 0 <= y + dy < cols and mask[(x + dx) * cols + y + dy]]
+        if not options:
+            stack.pop()
+            continue
+        nx, ny, wall_x, wall_y = rng.choice(options)
+        mask[wall_x * cols + wall_y] = 0
+        mask[nx * cols + ny] = 0
+        stack.append((nx, ny))
+    return mask
+
+
+def scattered_trash(rows, cols, mask, count, seed):
+    # `count` distinct free cells picked uniformly over the map
+    rng = random.Random(seed)
+    cells = set()
+    for _ in range(count * 1000):
+        if len(cells) == count:
+            break
+        x, y = rng.randrange(rows), rng.randrange(cols)
+        if not mask[x * cols + y]:
+            cells.add((x, y))
+    return sorted(cells)
+
+
+def clustered_trash(rows, cols, mask, count, seed, clusters=3, spread=None):
+    # Trash washed up in a few piles: free cells normally distributed around cluster centres
+    rng = random.Random(seed)
+    spread = spread or max(min(rows, cols) / 20, 1.0)
+    centres = [(rng.randrange(rows), rng.randrange(cols)) for _ in range(clusters)]
+    cells = set()
+    for _ in range(count * 1000):
+        if len(cells) == count:
+            break
+        cx, cy = rng.choice(centres)
+        x, y = round(rng.gauss(cx, spread)), round(rng.gauss(cy, spread))
+        if 0 <= x < rows and 0 <= y < cols and not mask[x * cols + y]:
+            cells.add((x, y))
+    return sorted(cells)
+
+
+def build_pathfinder(rows, cols, obstacles):
+    astar = AStarPathfinding(rows, cols)
+    # The pathfinder is brand new, so no listener holds state a layout change could invalidate
+    astar.obstacles[:] = obstacles
+    astar.obstacles[astar.start.index] = 0
+    astar.obstacles[astar.end.index] = 0
+    astar.grid_version += 1
+    return astar
+
+
+def place_trash(astar, cells):
+    for x, y in cells:
+        if (x, y) != (astar.start.x, astar.start.y) and (x, y) != (astar.end.x, astar.end.y):
+            cell = astar.grid[x][y]
+            cell.is_trash = True
+            astar.trash_positions.append(cell)